@@ -1,23 +1,27 @@
-from classification import preprocess
 from classification import document
+from typing import Union
 
 
-def naive_rule(text: str) -> bool:
+def naive_rule(text: Union[str, document.Document]) -> bool:
     """Given SEC document classify trade.
 
     For this naive rule, we simply look for LOI and business combination
     agreements while taking into account the number of redemptions.
     Args:
-        text: String SEC document.
+        text: String SEC document, or Document object to reuse its parsed
+            features.
     Returns:
         Boolean of whether we should trade or not.
     """
 
     # Initialize document object.
-    doc = document.Document(text)
+    if isinstance(text, document.Document):
+        doc = text
+    else:
+        doc = document.Document(text)
 
     # Reject if too many votes against.
-    votes = preprocess.parse_vote_results(text)
+    votes = doc.vote_results
     votes_for, votes_against, votes_abstain, votes_broker_non_votes = votes
     votes_total = (votes_for + votes_against +
                    votes_abstain + votes_broker_non_votes)
@@ -23,10 +23,11 @@ class NaiveStrategy(bt.Strategy):
         addstrategy method of a cerebro object.
         """
         self.close = self.data.close
-        self.filings = self.params.filings
         self.holding_period = self.params.holding_period
-        self.filings.sort(key=lambda file: file.accepted_date,
-                          reverse=False)
+        # Filings may be any iterable, e.g. Company.iter_filings.
+        self.filings = sorted(self.params.filings,
+                              key=lambda file: file.accepted_date,
+                              reverse=False)
         self.filing_index = 0
 
         # To keep track of pending orders.
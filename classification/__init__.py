@@ -14,6 +14,13 @@ VOTE_HEADER = [
     'for against abstentions broker non-votes',
     'for against abstentions broker non-vote'
 ]
+REDEMPTION_HEADER = [
+    'in connection with the extension',
+    'in connection with the closing',
+    'in advance of the special meeting',
+    'in connection with the special meeting',
+    'exercised their right'
+]
 FLS_START = [
     'forward-looking statements this current report',
     'forward looking statements certain statements',
@@ -32,4 +39,82 @@ FLS_END = [
     'or otherwise',
     'conditions or circumstances on which any such statement '
     'is based, except as required by applicable law'
-]
\ No newline at end of file
+]
+KEYWORDS_LOI = [
+    'entry into a letter of intent',
+    'entry into a non-binding letter of intent',
+    'enter into a letter of intent',
+    'enter into a non-binding letter of intent',
+    'entered into a letter of intent',
+    'entered into a non-binding letter of intent',
+    'entering into a letter of intent',
+    'entering into a non-binding letter of intent',
+    'execution of a letter of intent',
+    'execution of a non-binding letter of intent',
+    'execute a letter of intent',
+    'execute a non-binding letter of intent',
+    'executed a letter of intent',
+    'executed a non-binding letter of intent',
+    'executing a letter of intent',
+    'executing a non-binding letter of intent'
+]
+KEYWORDS_BUSINESS_COMBINATION_AGREEMENT = [
+    '("business combination agreement")',
+    '(the "business combination agreement")',
+    '("business combination")',
+    '(the "business combination")',
+    'entry into a definitive agreement',
+    'enter into a definitive agreement',
+    'entered into a definitive agreement',
+    'entering into a definitive agreement',
+    'business combination proposal was approved'
+]
+KEYWORDS_MERGER_AGREEMENT = ['(the "merger agreement")']
+KEYWORDS_PURCHASE_AGREEMENT = ['(the "purchase agreement")']
+KEYWORDS_EXTENSION = [
+    '(the "extension")',
+    '(the "extension amendment")',
+    'extended the termination date',
+    'extend the date by which the company must consummate',
+    'extend the date by which the company has to complete',
+    '(the "extension amendment proposal")',
+    '(the "extended termination date")'
+]
+KEYWORDS_MEETING = ['("special meeting")', '(the "meeting")']
+KEYWORDS_RECORD = ['(the "record date")']
+KEYWORDS_CONSUMMATION = [
+    'announcing the consummation',
+    'consummated the previously announced business combination'
+]
+KEYWORDS_IPO = [
+    'consummated its initial public offering ("ipo")',
+    'consummated its initial public offering (the "ipo")',
+    'consummated an initial public offering ("ipo")',
+    'consummated an initial public offering (the "ipo")',
+    'consummated the initial public offering ("ipo")',
+    'consummated the initial public offering (the "ipo")',
+    'completed its initial public offering ("ipo")',
+    'completed its initial public offering (the "ipo")',
+    'in connection with its initial public offering ("ipo") was declared '
+    'effective',
+    'in connection with its initial public offering (the "ipo") was declared '
+    'effective',
+    'consummated the ipo',
+    'in connection with the closing of the ipo',
+    'closing of the initial public offering (the "ipo")',
+    'consummation of the ipo'
+]
+KEYWORDS_TRUST = ['trust account']
+# Keyword category name -> phrases, in feature column order.
+KEYWORDS = {
+    'loi': KEYWORDS_LOI,
+    'business_combination_agreement': KEYWORDS_BUSINESS_COMBINATION_AGREEMENT,
+    'merger_agreement': KEYWORDS_MERGER_AGREEMENT,
+    'purchase_agreement': KEYWORDS_PURCHASE_AGREEMENT,
+    'extension': KEYWORDS_EXTENSION,
+    'meeting': KEYWORDS_MEETING,
+    'record': KEYWORDS_RECORD,
+    'consummation': KEYWORDS_CONSUMMATION,
+    'ipo': KEYWORDS_IPO,
+    'trust': KEYWORDS_TRUST
+}
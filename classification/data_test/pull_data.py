@@ -1,13 +1,18 @@
-from lxml import html
-import requests
 import lxml
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+import sec_scraper
+
+
+CACHE = sec_scraper.DocumentCache(
+    os.path.join(os.path.dirname(__file__), "..", "..",
+                 sec_scraper.cache.DEFAULT_CACHE_DIR))
 
 
 def get_request(url: str, timeout: int) -> lxml.html.HtmlElement:
     """Send request to server and output response in HtmlElement."""
-    page = requests.get(url, timeout=timeout)
-    return html.fromstring(page.content)
+    return sec_scraper.company.get_request(url, timeout, CACHE)
 
 
 def main():
@@ -1,17 +1,62 @@
 from classification import preprocess
+from classification.keywords import KEYWORD_MATCHER, PhraseMatches
+from typing import Dict, Tuple
 # import nltk
 
 
 class Document(object):
 
-    def __init__(self, text):
-        """Initialize document with raw SEC document text data."""
-        # Apply initial preprocessing to remove unicode characters etc.
-        self.text = preprocess.preprocess_document(text)
+    __slots__ = ('raw_text', '_text', '_item_mapping', '_vote_results',
+                 '_redemptions', '_keyword_matches')
 
-        # Parse out items in document.
-        self.item_mapping = preprocess.parse_items_mapping(self.text)
-        print('items:', list(self.item_mapping.keys()))
+    def __init__(self, text):
+        """Initialize document with raw SEC document text data.
+
+        Derived features are computed on first access and memoized, so
+        callers can query one document object repeatedly without reparsing.
+        """
+        self.raw_text = text
+        self._text = None
+        self._item_mapping = None
+        self._vote_results = None
+        self._redemptions = None
+        self._keyword_matches = None
+
+    @property
+    def text(self) -> str:
+        """Text after initial preprocessing, see preprocess_document."""
+        if self._text is None:
+            self._text = preprocess.preprocess_document(self.raw_text)
+        return self._text
+
+    @property
+    def item_mapping(self) -> Dict[str, str]:
+        """Mapping of items in document to their text."""
+        if self._item_mapping is None:
+            self._item_mapping = preprocess.parse_items_mapping(self.text)
+            print('items:', list(self._item_mapping.keys()))
+        return self._item_mapping
+
+    @property
+    def vote_results(self) -> Tuple[float, float, float, float]:
+        """Votes for, against, abstain and broker non-votes in raw text."""
+        if self._vote_results is None:
+            self._vote_results = preprocess.parse_vote_results(self.raw_text)
+        return self._vote_results
+
+    @property
+    def redemptions(self) -> float:
+        """Number of redeemed shares in raw text."""
+        if self._redemptions is None:
+            self._redemptions = preprocess.parse_redemptions(self.raw_text)
+        return self._redemptions
+
+    @property
+    def keyword_matches(self) -> PhraseMatches:
+        """Keyword phrases of all categories, found in a single scan."""
+        if self._keyword_matches is None:
+            self._keyword_matches = KEYWORD_MATCHER.match(self.text)
+        return self._keyword_matches
 
     # def _normalize_text(self):
     #     """Normalize text, get rid of stop words and stem words."""
@@ -33,94 +78,33 @@ class Document(object):
 
     def is_letter_of_intent(self) -> bool:
         """Check if document is a letter of intent."""
-        loi_phrases = [
-            'entry into a letter of intent',
-            'entry into a non-binding letter of intent',
-            'enter into a letter of intent',
-            'enter into a non-binding letter of intent',
-            'entered into a letter of intent',
-            'entered into a non-binding letter of intent',
-            'entering into a letter of intent',
-            'entering into a non-binding letter of intent',
-            'execution of a letter of intent',
-            'execution of a non-binding letter of intent',
-            'execute a letter of intent',
-            'execute a non-binding letter of intent',
-            'executed a letter of intent',
-            'executed a non-binding letter of intent',
-            'executing a letter of intent',
-            'executing a non-binding letter of intent'
-        ]
-        return any(phrase in self.text for phrase in loi_phrases)
+        return self.keyword_matches.found('loi')
 
     def is_business_combination_agreement(self) -> bool:
         """Check if document is a business combination agreement."""
-        bca_phrases = [
-            '("business combination agreement")',
-            '(the "business combination agreement")',
-            '("business combination")',
-            '(the "business combination")',
-            'entry into a definitive agreement',
-            'enter into a definitive agreement',
-            'entered into a definitive agreement',
-            'entering into a definitive agreement',
-            'business combination proposal was approved'
-        ]
-        return any(phrase in self.text for phrase in bca_phrases)
+        return self.keyword_matches.found('business_combination_agreement')
 
     def is_consummation(self) -> bool:
         """"Check if document is a consummation."""
-        consummation_phrases = [
-            'announcing the consummation',
-            'consummated the previously announced business combination'
-        ]
-        return any(phrase in self.text for phrase in consummation_phrases)
+        return self.keyword_matches.found('consummation')
 
     def is_extension(self) -> bool:
         """Check if document is a extension."""
-        extension_phrases = [
-            '(the "extension")',
-            '(the "extension amendment")',
-            'extended the termination date',
-            'extend the date by which the company must consummate',
-            'extend the date by which the company has to complete',
-            '(the "extension amendment proposal")',
-            '(the "extended termination date")'
-        ]
-        return any(phrase in self.text for phrase in extension_phrases)
+        return self.keyword_matches.found('extension')
 
     def is_trust(self) -> bool:
         """Check if document is a trust account."""
-        trust_phrases = [
-            'trust account'
-        ]
-        return any(phrase in self.text for phrase in trust_phrases)
+        return self.keyword_matches.found('trust')
 
     def is_ipo(self) -> bool:
         """"Check if document is a ipo."""
-        ipo_phrases = [
-            'consummated its initial public offering ("ipo")',
-            'consummated its initial public offering (the "ipo")',
-            'consummated an initial public offering ("ipo")',
-            'consummated an initial public offering (the "ipo")',
-            'consummated the initial public offering ("ipo")',
-            'consummated the initial public offering (the "ipo")',
-            'completed its initial public offering ("ipo")',
-            'completed its initial public offering (the "ipo")',
-            'in connection with its initial public offering ("ipo") was declared effective',
-            'in connection with its initial public offering (the "ipo") was declared effective',
-            'consummated the ipo',
-            'in connection with the closing of the ipo',
-            'closing of the initial public offering (the "ipo")',
-            'consummation of the ipo'
-        ]
-        return any(phrase in self.text for phrase in ipo_phrases)
+        return self.keyword_matches.found('ipo')
 
     def is_item_203(self) -> bool:
         """Check if document is a item 2.03."""
         item_phrases = [
             'item 2.03'
         ]
-        return any(phrase in list(self.item_mapping.keys()) for phrase in item_phrases)
+        return any(phrase in self.item_mapping for phrase in item_phrases)
 
     # todo: add redemption
@@ -0,0 +1,121 @@
+from classification import KEYWORDS
+from typing import Dict, List, Tuple
+import re
+
+
+def _trie_pattern(node: dict) -> str:
+    """Build regex matching the longest path through a character trie.
+
+    The key '' marks the end of a phrase.
+    """
+    branches = [re.escape(char) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    pattern = branches[0] if len(branches) == 1 else \
+        '(?:%s)' % '|'.join(branches)
+    if '' in node:
+        pattern = '(?:%s)?' % pattern
+    return pattern
+
+
+class PhraseMatches(object):
+
+    def __init__(self, offsets: Dict[str, List[Tuple[int, str]]],
+                 counts: Dict[str, int]):
+        """Initialize result of scanning a text for keyword phrases.
+
+        Args:
+            offsets: Dictionary mapping category to list of (offset, phrase)
+                of every occurrence, in text order.
+            counts: Dictionary mapping category to number of occurrences,
+                counted like str.count per phrase and summed per category.
+        """
+        self.offsets = offsets
+        self.counts = counts
+
+    def count(self, category: str) -> int:
+        """Get number of occurrences of phrases of category."""
+        return self.counts[category]
+
+    def found(self, category: str) -> bool:
+        """Check if any phrase of category occurs in text."""
+        return self.counts[category] > 0
+
+
+class PhraseMatcher(object):
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        """Initialize matcher for phrases of several categories.
+
+        All phrases are compiled into one regex shaped like a trie of their
+        characters, wrapped in a lookahead, so a single scan reports the
+        longest phrase starting at every offset. Shorter phrases starting at
+        the same offset are always prefixes of that phrase, and are added
+        from a precomputed prefix table.
+        Args:
+            categories: Dictionary mapping category name to list of phrases.
+        """
+        self.categories = {category: list(phrases)
+                           for category, phrases in categories.items()}
+        self._phrase_categories = {}
+        for category, phrases in self.categories.items():
+            for phrase in phrases:
+                self._phrase_categories.setdefault(phrase, []).append(
+                    category)
+        phrases = list(self._phrase_categories)
+        trie = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        self._pattern = re.compile('(?=(%s))' % _trie_pattern(trie))
+        self._prefixes = {
+            phrase: [other for other in phrases if phrase.startswith(other)]
+            for phrase in phrases
+        }
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """Find offsets of every occurrence of every phrase in text.
+
+        Args:
+            text: String text to scan.
+        Returns:
+            Dictionary mapping phrase to list of offsets, in text order.
+            Occurrences of a phrase may overlap.
+        """
+        offsets = {}
+        for match in self._pattern.finditer(text):
+            for phrase in self._prefixes[match.group(1)]:
+                offsets.setdefault(phrase, []).append(match.start())
+        return offsets
+
+    def match(self, text: str) -> PhraseMatches:
+        """Scan text once and collect matches of all categories.
+
+        Args:
+            text: String text to scan.
+        Returns:
+            PhraseMatches object.
+        """
+        offsets = {category: [] for category in self.categories}
+        counts = {category: 0 for category in self.categories}
+        for phrase, phrase_offsets in self.scan(text).items():
+            # Count non-overlapping occurrences, as str.count does.
+            count, end = 0, 0
+            for offset in phrase_offsets:
+                if offset >= end:
+                    count += 1
+                    end = offset + len(phrase)
+            for category in self._phrase_categories[phrase]:
+                offsets[category].extend(
+                    (offset, phrase) for offset in phrase_offsets)
+                counts[category] += count
+        for category_offsets in offsets.values():
+            category_offsets.sort()
+        return PhraseMatches(offsets, counts)
+
+
+# Matcher for all keyword categories, shared by documents and features.
+KEYWORD_MATCHER = PhraseMatcher(KEYWORDS)
@@ -1,22 +1,175 @@
-from classification import HEADER, FOOTER, VOTE_HEADER, FLS_START, FLS_END
-from typing import Dict
+from classification import (HEADER, FOOTER, VOTE_HEADER, REDEMPTION_HEADER,
+                            FLS_START, FLS_END)
+from typing import Dict, Iterable, List, Optional, Tuple
 import re
 import numpy as np
+import pandas as pd
 
 
-def _search_text(txt: str, prefix: str, suffix: str) -> str:
-    """Find text in between prefix and suffix.
+# str.translate tables for normalize_text.
+# New lines and non-breaking spaces to spaces.
+BASIC_TRANSLATION = str.maketrans({'\n': ' ', '\xa0': ' '})
+# Curly quotation marks, in cp1252 and unicode, to straight ones.
+QUOTE_TRANSLATION = str.maketrans({
+    '\x93': '"', '\x94': '"', '”': '"', '“': '"'
+})
+# New lines, tabs and non-breaking spaces to spaces, and quotation marks.
+DOCUMENT_TRANSLATION = {**BASIC_TRANSLATION, **QUOTE_TRANSLATION,
+                        ord('\t'): ' '}
+# Tabs removed, and quotation marks.
+TAB_QUOTE_TRANSLATION = {**QUOTE_TRANSLATION, ord('\t'): None}
+_EXTRA_SPACES = re.compile(' {2,}')
+ITEM_PATTERN = re.compile(r'item [0-9]+\.[0-9]+')
+# Vote table headers, longest first so each match is the longest header at
+# its offset. Shorter headers at the same offset are its prefixes.
+_VOTE_HEADER_PATTERN = re.compile('|'.join(
+    re.escape(header) for header in sorted(VOTE_HEADER, key=len, reverse=True)))
+_VOTE_HEADER_PREFIXES = {
+    header: [other for other in VOTE_HEADER if header.startswith(other)]
+    for header in VOTE_HEADER
+}
+_VOTE_HEADER_PRIORITY = {header: i for i, header in enumerate(VOTE_HEADER)}
+# Four tokens after a vote table header, as str.lstrip().split(' ') reads them.
+_VOTE_TOKENS = re.compile(r'\s*([^ ]*)(?: ([^ ]*))?(?: ([^ ]*))?(?: ([^ ]*))?')
+VOTE_RESULT_COLUMNS = ['votes_for', 'votes_against', 'votes_abstain',
+                       'votes_broker_non_votes']
+_DOLLAR_AMOUNT = re.compile(r'[\$]{1}[\d,]+\.?\d{0,2}')
+_SHARES_STRONG = re.compile('([0-9]+) shares')
+_SHARES_WEAK = re.compile('[0-9]+')
 
-    If suffix is "" find all text post prefix.
+
+def normalize_text(text: str, translation: Dict[int, str] = None,
+                   collapse_spaces=True, lower=True) -> str:
+    """Normalize characters and spaces of text.
+
+    All character replacements are applied in one str.translate pass, and
+    runs of spaces are collapsed with one regex pass.
+    Args:
+        text: String text.
+        translation: Translation table as built by str.maketrans, defaults
+            to DOCUMENT_TRANSLATION.
+        collapse_spaces: Boolean, if True replace runs of spaces by one.
+        lower: Boolean, if True lower case the text.
+    Returns:
+        String normalized text.
+    """
+    if translation is None:
+        translation = DOCUMENT_TRANSLATION
+    text = text.translate(translation)
+    if collapse_spaces:
+        text = _EXTRA_SPACES.sub(' ', text)
+    if lower:
+        text = text.lower()
+    return text
+
+
+class SplicedText(object):
+
+    def __init__(self, text: str):
+        """Initialize text that can be spliced without copying it.
+
+        The text is kept as a list of (start, end) segments of the original
+        string. Phrases are found with bounded str.find calls on the original
+        string per segment, plus a look at the few characters around each
+        splice point, and results are memoized until the next splice.
+        Args:
+            text: String original text.
+        """
+        self.text = text
+        self.segments = [(0, len(text))] if text else []
+        self._length = len(text)
+        self._found = {}
+
+    def __len__(self) -> int:
+        return self._length
+
+    def find(self, phrase: str) -> int:
+        """Get lowest index of phrase in spliced text, -1 if not found."""
+        if phrase not in self._found:
+            self._found[phrase] = self._find(phrase)
+        return self._found[phrase]
+
+    def _find(self, phrase: str) -> int:
+        """Find phrase segment by segment."""
+        length = len(phrase)
+        position = 0
+        for i, (start, end) in enumerate(self.segments):
+            ind = self.text.find(phrase, start, end)
+            if ind != -1:
+                return position + ind - start
+            # Phrase starting in this segment and crossing into the next.
+            if i + 1 < len(self.segments) and length > 1:
+                left = self.text[max(start, end - length + 1):end]
+                window = left + self._read(i + 1, length - 1)
+                k = window.find(phrase)
+                if k != -1 and k < len(left):
+                    return position + end - start - len(left) + k
+            position += end - start
+        return -1
+
+    def index(self, phrase: str) -> int:
+        """Get lowest index of phrase in spliced text, like str.index."""
+        ind = self.find(phrase)
+        if ind == -1:
+            raise ValueError("substring not found")
+        return ind
+
+    def _read(self, i: int, size: int) -> str:
+        """Read up to size characters starting at segment i."""
+        pieces = []
+        for start, end in self.segments[i:]:
+            pieces.append(self.text[start:min(end, start + size)])
+            size -= end - start
+            if size <= 0:
+                break
+        return ''.join(pieces)
+
+    def _cut(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Get segments covering spliced text from start to end."""
+        segments = []
+        position = 0
+        for seg_start, seg_end in self.segments:
+            seg_length = seg_end - seg_start
+            lo = max(start - position, 0)
+            hi = min(end - position, seg_length)
+            if lo < hi:
+                segments.append((seg_start + lo, seg_start + hi))
+            position += seg_length
+        return segments
+
+    def splice(self, start: int, end: int):
+        """Replace spliced text by text[:start] + text[end:]."""
+        self.segments = (self._cut(0, start) +
+                         self._cut(end, self._length))
+        self._length = sum(seg_end - seg_start
+                           for seg_start, seg_end in self.segments)
+        self._found = {}
+
+    def slice(self, start: int, end: int) -> str:
+        """Get text[start:end] of spliced text as a string."""
+        start, end, _ = slice(start, end).indices(self._length)
+        return ''.join(self.text[seg_start:seg_end]
+                       for seg_start, seg_end in self._cut(start, end))
+
+
+def remove_forward_looking_statements(spliced: SplicedText,
+                                      fls_start: List[str],
+                                      fls_end: List[str]):
+    """Remove forward-looking statement sections from spliced text.
+
+    Every pair of start and end phrase is tried in order, cutting from the
+    start phrase to the end of the end phrase whenever both are found.
     Args:
-        prefix: String prefix which parameterizes start index.
-        suffix: String suffix which parameterizes end index.
-    Return:
-        String text in between suffix and prefix.
+        spliced: SplicedText object, modified in place.
+        fls_start: List of string phrases starting the section.
+        fls_end: List of string phrases ending the section.
     """
-    start = txt.index(prefix) + len(prefix)
-    end = txt.index(suffix) if suffix is not "" else len(txt)
-    return txt[start:end]
+    for forward_start in fls_start:
+        for forward_end in fls_end:
+            ind_start = spliced.find(forward_start)
+            ind_end = spliced.find(forward_end)
+            if ind_start != -1 and ind_end != -1:
+                spliced.splice(ind_start, ind_end + len(forward_end))
 
 
 def preprocess_document(text: str) -> str:
@@ -31,31 +184,97 @@ def preprocess_document(text: str) -> str:
     Returns:
         String for processed document text.
     """
-    # Replace new line and tabs.
-    text = text.replace('\n', ' ').replace('\t', ' ')
-    # Replace unicode characters.
-    unicode_replacements = {
-        '\xa0': ' ', '\x93': '"', '\x94': '"',
-        '”': '"', '“': '"'
-    }
-    for unicode, replacement in unicode_replacements.items():
-        text = text.replace(unicode, replacement)
-
-    # Remove extra spaces.
-    text = re.sub(' +', ' ', text)
-    text = text.lower()
-    
+    # Replace new line, tabs and unicode characters, remove extra spaces and
+    # lower case.
+    text = normalize_text(text)
+
     # Remove forward looking statement section.
-    for forward_start in FLS_START:
-        for forward_end in FLS_END:
-            ind_start = text.find(forward_start)
-            ind_end = text.find(forward_end)
-            if ind_start != -1 and ind_end != -1:
-                text = text[0:ind_start] + text[ind_end + len(forward_end):]
+    spliced = SplicedText(text)
+    remove_forward_looking_statements(spliced, FLS_START, FLS_END)
 
     # Remove everything in header and footer.
-    text = _search_text(text, HEADER, FOOTER)
-    return text
+    start = spliced.index(HEADER) + len(HEADER)
+    end = spliced.index(FOOTER)
+    return spliced.slice(start, end)
+
+
+def find_items(text: str) -> Dict[str, int]:
+    """Find item subheaders and the offset of their first occurrence.
+
+    A subheader is of the form "item 7.01". Subheaders are found in a single
+    regex pass. A subheader can first occur as the prefix of a longer one,
+    e.g. "item 1.01" in "item 1.012", which is accounted for so offsets
+    match text.find(subheader).
+    Args:
+        text: String SEC filing document, post preprocessing.
+    Returns:
+        Dictionary mapping subheader to offset, in order of first appearance.
+    """
+    matches = [(match.group(), match.start())
+               for match in ITEM_PATTERN.finditer(text)]
+    items = dict.fromkeys(subheader for subheader, _ in matches)
+    for subheader, offset in matches:
+        # Prefixes of subheader that are subheaders themselves, e.g.
+        # "item 1.01" for "item 1.012".
+        decimal = subheader.index('.') + 2
+        for end in range(decimal, len(subheader) + 1):
+            prefix = subheader[:end]
+            if prefix in items and items[prefix] is None:
+                items[prefix] = offset
+    return items
+
+
+def parse_item_spans(text: str, sort=True,
+                     include_subheader=False) -> Dict[str, Tuple[int, int]]:
+    """Get span of text of each item section, without copying it.
+
+    The section of a subheader runs from its first occurrence to the first
+    occurrence of the next subheader, or to the end of the text for the last
+    one. The span is empty if the next subheader occurs first.
+    Args:
+        text: String SEC filing document, post preprocessing.
+        sort: Boolean, if True order subheaders by item number, otherwise by
+            first appearance.
+        include_subheader: Boolean, if True spans start at the subheader,
+            otherwise right after it.
+    Returns:
+        Dictionary mapping subheader to (start, end) indices into text.
+    """
+    items = find_items(text)
+    subheaders = sorted(items) if sort else list(items)
+    spans = {}
+    for i, subheader in enumerate(subheaders):
+        start = items[subheader]
+        if not include_subheader:
+            start += len(subheader)
+        if i >= len(subheaders) - 1:
+            end = len(text)
+        else:
+            end = items[subheaders[i + 1]]
+        spans[subheader] = (start, max(start, end))
+    return spans
+
+
+def build_item_flags(texts: Iterable[str], items: List[str]) -> np.ndarray:
+    """Build item presence flags for many documents at once.
+
+    Item subheaders of all texts are extracted in one vectorized findall,
+    and flags are set with a single fancy-indexed assignment.
+    Args:
+        texts: Iterable of string SEC filing documents, post preprocessing.
+        items: List of item subheaders to flag, e.g. ['item 1.01'].
+    Returns:
+        Numpy uint8 array of shape (number of texts, number of items), 1 if
+        the item subheader is in the text and 0 otherwise.
+    """
+    found = pd.Series(list(texts), dtype=object).str.findall(ITEM_PATTERN)
+    flags = np.zeros((len(found), len(items)), dtype=np.uint8)
+    found = found.explode()
+    columns = found.map({item: j for j, item in enumerate(items)})
+    present = columns.notna().to_numpy()
+    flags[found.index.to_numpy()[present],
+          columns.to_numpy()[present].astype(int)] = 1
+    return flags
 
 
 def parse_items_mapping(text: str) -> Dict[str, str]:
@@ -63,26 +282,56 @@ def parse_items_mapping(text: str) -> Dict[str, str]:
 
     Parse out all subheaders and create a mapping from subheader to its
     corresponding subtext. A subheader is of the form "item 7.01" and the
-    associated subtext follows said subheader until the next item.
+    associated subtext follows said subheader until the next item, with
+    subheaders sorted.
     Args:
         text: String SEC filing document, post preprocessing.
     Returns:
         Dictionary mapping subheader to subtext.
     """
-    # Extract subheaders and get rid of duplicates
-    subheaders = re.findall(r'item [0-9]+\.[0-9]+', text)
-    subheaders = list(set(subheaders))
-    subheaders.sort()
+    return {subheader: text[start:end]
+            for subheader, (start, end) in parse_item_spans(text).items()}
 
-    # Map subheader to its associated text.
-    item_mapping = {}
-    for i, subheader in enumerate(subheaders):
-        if i >= len(subheaders) - 1:
-            subtext = _search_text(text, subheader, "")
-        else:
-            subtext = _search_text(text, subheader, subheaders[i + 1])
-        item_mapping[subheader] = subtext
-    return item_mapping
+
+def find_vote_counts(text: str) -> Optional[List[str]]:
+    """Find vote count strings following the vote table header.
+
+    A single scan finds every vote table header, and the header appearing
+    first in VOTE_HEADER wins, at its first offset. Only the four tokens
+    after it are read, as if splitting the stripped rest of the text on
+    spaces.
+    Args:
+        text: String SEC document, post preprocessing.
+    Returns:
+        List of four strings for (votes for, votes against, votes abstain,
+        votes broker non-votes), empty strings for tokens past the end of
+        text. None if there is no vote table header.
+    """
+    best_priority, best_end = len(VOTE_HEADER), None
+    for match in _VOTE_HEADER_PATTERN.finditer(text):
+        for vote_string in _VOTE_HEADER_PREFIXES[match.group()]:
+            priority = _VOTE_HEADER_PRIORITY[vote_string]
+            if priority < best_priority:
+                best_priority = priority
+                best_end = match.start() + len(vote_string)
+        if best_priority == 0:
+            break
+    if best_end is None:
+        return None
+    tokens = _VOTE_TOKENS.match(text, best_end)
+    return [token or '' for token in tokens.groups()]
+
+
+def convert_vote_count(vote_string: str) -> int:
+    """Convert vote string to int, nan if it is not a whole vote count."""
+    # To indicate 0 votes, sometimes 8-K has dash (two types) instead of 0.
+    if '—' in vote_string or '-' in vote_string or 'n/a' in vote_string:
+        return 0
+    try:
+        votes = int(vote_string.replace(',', ''))
+    except ValueError:
+        return np.nan
+    return votes
 
 
 def parse_vote_results(text) -> (float, float, float, float):
@@ -94,35 +343,101 @@ def parse_vote_results(text) -> (float, float, float, float):
     Args:
         text: String SEC document, post preprocessing.
     Returns:
-        Tuple of floats for (votes for, votes against, votes abstain,
-        votes broker non-votes).
+        Tuple of ints for (votes for, votes against, votes abstain,
+        votes broker non-votes), nan for counts that do not parse.
     """
-    def convert_vote_count_to_int(vote_string) -> float:
-        """Convert vote string to int."""
-        # To indicate 0 votes, sometimes 8-K has dash (two types) instead of 0.
-        if '—' in vote_string or '-' in vote_string or 'n/a' in vote_string:
-            return 0.0
-        try:
-            votes = float(vote_string.replace(',', ''))
-        except ValueError:
-            return np.nan
-        return votes
-
-    # find phrases preceding vote results in text
-    vote_strings = [vote_string for vote_string in VOTE_HEADER if vote_string in text]
-
-    # parse votes for, votes against, votes abstain, votes broker non votes
-    if len(vote_strings)==0:
+    vote_counts = find_vote_counts(text)
+    if vote_counts is None:
         return np.nan, np.nan, np.nan, np.nan
-    else:
-        vote_string = vote_strings[0] # use first if multiple matches
-        vote_index = text.find(vote_string)
-        vote_data = text[(vote_index + len(vote_string)):].lstrip().split(' ')
-        votes_for = convert_vote_count_to_int(vote_data[0])
-        votes_against = convert_vote_count_to_int(vote_data[1])
-        votes_abstain = convert_vote_count_to_int(vote_data[2])
-        votes_broker_non_votes = convert_vote_count_to_int(vote_data[3])
-        return (votes_for, votes_against,
-                votes_abstain, votes_broker_non_votes)
-
-# TODO: add parse_redemptions()
+    return tuple(convert_vote_count(count) for count in vote_counts)
+
+
+def parse_vote_results_series(texts: pd.Series) -> pd.DataFrame:
+    """Parse voting results of many documents.
+
+    Args:
+        texts: Series of string SEC documents, post preprocessing.
+    Returns:
+        Dataframe with the index of texts and float columns of
+        VOTE_RESULT_COLUMNS, plus boolean column vote_parse_error, True where
+        a vote table was found but not all of its counts parsed.
+    """
+    vote_counts = [find_vote_counts(text) for text in texts]
+    votes = pd.DataFrame(
+        [(np.nan,) * 4 if counts is None else
+         tuple(convert_vote_count(count) for count in counts)
+         for counts in vote_counts],
+        index=texts.index, columns=VOTE_RESULT_COLUMNS, dtype=np.float64)
+    found = np.array([counts is not None for counts in vote_counts],
+                     dtype=bool)
+    votes['vote_parse_error'] = found & votes.isna().any(axis=1).to_numpy()
+    return votes
+
+
+def find_redemption_sentence(text: str) -> Optional[str]:
+    """Find the sentence stating redemptions.
+
+    The sentence of the phrase appearing first in REDEMPTION_HEADER wins, at
+    the first sentence also mentioning redemptions. Sentences are split on
+    '.', and only those around occurrences of a phrase are read.
+    Args:
+        text: String SEC document, post preprocessing.
+    Returns:
+        String sentence, None if not found.
+    """
+    for redemption_phrase in REDEMPTION_HEADER:
+        index = text.find(redemption_phrase)
+        while index != -1:
+            start = text.rfind('.', 0, index) + 1
+            end = text.find('.', index + len(redemption_phrase))
+            sentence = text[start:] if end == -1 else text[start:end]
+            if 'redeem' in sentence or 'redemp' in sentence:
+                return sentence
+            if end == -1:
+                break
+            # Later occurrences in the same sentence cannot match either.
+            index = text.find(redemption_phrase, end)
+    return None
+
+
+def parse_redemptions(text) -> float:
+    """Parse number of redeemed shares.
+
+    Given SEC document, find the first sentence mentioning redemptions after
+    one of the redemption header phrases, and parse the number of shares
+    redeemed from it.
+    Args:
+        text: String SEC document, post preprocessing.
+    Returns:
+        Float number of redeemed shares, nan if not found or ambiguous.
+    """
+    sentence = find_redemption_sentence(text)
+    if sentence is None:
+        return np.nan
+
+    sentence = sentence.lstrip().replace(',', '')
+    # Remove dollar amounts.
+    sentence = _DOLLAR_AMOUNT.sub('', sentence)
+    shares_strong = _SHARES_STRONG.findall(sentence)
+    shares_weak = _SHARES_WEAK.findall(sentence)
+    if len(shares_weak) == 1:
+        # Only one number in sentence, assume it is the redemption number.
+        return float(shares_weak[0])
+    if len(shares_weak) > 1:
+        # Several numbers, use the one followed by 'shares' if unique.
+        if len(shares_strong) == 1:
+            return float(shares_strong[0])
+        return np.nan
+    return 0.0 if 'none' in sentence else np.nan
+
+
+def parse_redemptions_series(texts: pd.Series) -> pd.Series:
+    """Parse number of redeemed shares of many documents.
+
+    Args:
+        texts: Series of string SEC documents, post preprocessing.
+    Returns:
+        Float series of redeemed shares with the index of texts.
+    """
+    return pd.Series([parse_redemptions(text) for text in texts],
+                     index=texts.index, dtype=np.float64)
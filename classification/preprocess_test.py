@@ -0,0 +1,106 @@
+from classification import HEADER, FOOTER, FLS_START, FLS_END
+from classification import preprocess
+import numpy as np
+import pandas as pd
+import pytest
+import glob
+import os
+import re
+
+
+def reference_preprocess_document(text):
+    """Previous implementation of preprocess_document, copying the text."""
+    text = text.replace('\n', ' ').replace('\t', ' ')
+    unicode_replacements = {
+        '\xa0': ' ', '\x93': '"', '\x94': '"',
+        '”': '"', '“': '"'
+    }
+    for unicode, replacement in unicode_replacements.items():
+        text = text.replace(unicode, replacement)
+    text = re.sub(' +', ' ', text)
+    text = text.lower()
+    for forward_start in FLS_START:
+        for forward_end in FLS_END:
+            ind_start = text.find(forward_start)
+            ind_end = text.find(forward_end)
+            if ind_start != -1 and ind_end != -1:
+                text = text[0:ind_start] + text[ind_end + len(forward_end):]
+    start = text.index(HEADER) + len(HEADER)
+    end = text.index(FOOTER)
+    return text[start:end]
+
+
+@pytest.fixture
+def corpus():
+    """Aggregate all test documents."""
+    filepaths = glob.glob(
+        os.path.join(os.path.dirname(__file__), "data_test/*/*.txt")
+    )
+    return [(file, open(file, "r").read()) for file in sorted(filepaths)]
+
+
+def test_preprocess_document_matches_reference(corpus):
+    """Test spliced forward-looking statement removal on test documents."""
+    for filepath, text in corpus:
+        failure_message = "File failure %s" % filepath
+        try:
+            expected = reference_preprocess_document(text)
+        except ValueError:
+            with pytest.raises(ValueError):
+                preprocess.preprocess_document(text)
+            continue
+        assert preprocess.preprocess_document(text) == expected, \
+            failure_message
+
+
+def test_spliced_text_overlapping_cuts():
+    """Test cuts where the end phrase precedes the start phrase."""
+    text = 'a end b start c end d start e'
+    fls_start, fls_end = ['start'], ['end', ' c']
+    expected = text
+    for forward_start in fls_start:
+        for forward_end in fls_end:
+            ind_start = expected.find(forward_start)
+            ind_end = expected.find(forward_end)
+            if ind_start != -1 and ind_end != -1:
+                expected = (expected[0:ind_start] +
+                            expected[ind_end + len(forward_end):])
+
+    spliced = preprocess.SplicedText(text)
+    preprocess.remove_forward_looking_statements(spliced, fls_start, fls_end)
+    assert spliced.slice(0, len(spliced)) == expected
+    for phrase in fls_start + fls_end:
+        assert spliced.find(phrase) == expected.find(phrase)
+
+
+def test_parse_vote_results_and_redemptions_series():
+    """Test header priority and tokens read by the vote and redemption
+    parsers."""
+    texts = pd.Series([
+        'for against abstention broker non-vote 1 2 3 4 '
+        'for against abstain broker non-votes  1,000 — 30 n/a',
+        'for against abstentions broker non-votes 5 6',
+        'holders redeemed 10 shares in connection with the closing. '
+        'in connection with the extension, the meeting was held. '
+        'in connection with the extension 2,500 shares were redeemed at '
+        '$10.05 per share. 7 holders exercised their right to redeem',
+        'no votes.',
+    ], index=[3, 5, 7, 9])
+    votes = preprocess.parse_vote_results_series(texts)
+    assert votes.index.tolist() == [3, 5, 7, 9]
+    # The first header in VOTE_HEADER wins, not the first one in the text.
+    assert votes.iloc[0, :4].tolist() == [1000.0, 0.0, 30.0, 0.0]
+    assert votes.iloc[1, :2].tolist() == [5.0, 6.0]
+    assert votes.iloc[1, 2:4].isna().all()
+    assert votes.iloc[2:, :4].isna().all().all()
+    assert votes.vote_parse_error.tolist() == [False, True, False, False]
+
+    # Counts parse as whole numbers only, as in the training pipeline.
+    assert np.isnan(preprocess.convert_vote_count('500.'))
+    assert np.isnan(preprocess.convert_vote_count('1e3'))
+    assert preprocess.convert_vote_count('1,000') == 1000
+
+    redemptions = preprocess.parse_redemptions_series(texts)
+    assert redemptions.index.tolist() == [3, 5, 7, 9]
+    assert redemptions.iloc[2] == 2500.0
+    assert redemptions.drop(7).isna().all()
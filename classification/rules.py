@@ -0,0 +1,122 @@
+from typing import Iterable, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+# Comparison operators of rule conditions. Comparisons with nan are False,
+# except '!='.
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+
+class Rule(object):
+
+    def __init__(self, name: str, label: int,
+                 conditions: Iterable[Tuple[str, str, float]]):
+        """Initialize rule labeling rows where all conditions hold.
+
+        Args:
+            name: String name of rule.
+            label: Integer label of rows matched by rule.
+            conditions: Iterable of (column, operator, value), operator one
+                of OPERATORS.
+        """
+        self.name = name
+        self.label = label
+        self.conditions = [tuple(condition) for condition in conditions]
+        for column, operator, value in self.conditions:
+            if operator not in OPERATORS:
+                raise ValueError('unknown operator %s in rule %s'
+                                 % (operator, name))
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Get boolean array, True for rows where all conditions hold."""
+        mask = np.ones(len(df), dtype=bool)
+        for column, operator, value in self.conditions:
+            mask &= OPERATORS[operator](
+                df[column].to_numpy(dtype=np.float64), value)
+        return mask
+
+
+class RuleSet(object):
+
+    def __init__(self, rules: Sequence[Rule], default: int = 0):
+        """Initialize ordered set of rules, evaluated over whole columns.
+
+        Rules take precedence in order: each row gets the label of the first
+        rule matching it, like a chain of if/elif branches, and default if
+        none does.
+        Args:
+            rules: Sequence of Rule objects, in order of precedence.
+            default: Integer label of rows matched by no rule.
+        """
+        self.rules = list(rules)
+        self.default = default
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], default: int = 0):
+        """Build rule set from data, e.g. loaded from JSON.
+
+        Args:
+            records: Iterable of dictionaries with keys name, label and
+                conditions, in order of precedence.
+            default: Integer label of rows matched by no rule.
+        Returns:
+            RuleSet object.
+        """
+        return cls([Rule(record['name'], record['label'],
+                         record['conditions']) for record in records],
+                   default=default)
+
+    def to_records(self) -> List[dict]:
+        """Get rules as data, inverse of from_records."""
+        return [{'name': rule.name, 'label': rule.label,
+                 'conditions': [list(condition)
+                                for condition in rule.conditions]}
+                for rule in self.rules]
+
+    def add(self, rule: Rule, position: int = None):
+        """Add rule, last in precedence unless position is given."""
+        if position is None:
+            self.rules.append(rule)
+        else:
+            self.rules.insert(position, rule)
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Label all rows of df.
+
+        Args:
+            df: Dataframe with all columns used by rule conditions.
+        Returns:
+            Integer array of labels, one per row.
+        """
+        labels = np.full(len(df), self.default, dtype=int)
+        unmatched = np.ones(len(df), dtype=bool)
+        for rule in self.rules:
+            mask = unmatched & rule.mask(df)
+            labels[mask] = rule.label
+            unmatched &= ~mask
+        return labels
+
+
+# Production rules classifying an 8-K as 1 (buy warrant) or 0 (do nothing).
+# A high share of votes against, or an IPO, vetoes buying. Otherwise keywords
+# of a deal trigger buying, unless the 8-K reports a new financial obligation
+# (item 2.03).
+WARRANT_RULES = RuleSet.from_records([
+    {'name': 'vote against veto', 'label': 0,
+     'conditions': [('%vote_against', '>', .10)]},
+    {'name': 'ipo veto', 'label': 0,
+     'conditions': [('keywords_ipo', '>', 0)]},
+] + [
+    {'name': category, 'label': 1,
+     'conditions': [('keywords_' + category, '>', 0), ('item 2.03', '==', 0)]}
+    for category in ['loi', 'business_combination_agreement', 'consummation',
+                     'extension', 'trust']
+])
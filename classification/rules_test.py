@@ -0,0 +1,65 @@
+from classification import rules
+import numpy as np
+import pandas as pd
+
+
+def reference_classifier(x):
+    """Previous row by row rule based classifier."""
+    if ~np.isnan(x['%vote_against']) and (x['%vote_against'] > .10):
+        return 0
+    elif x['keywords_ipo'] > 0:
+        return 0
+    else:
+        if (x['keywords_loi'] > 0) and (x['item 2.03'] == 0):
+            return 1
+        elif (x['keywords_business_combination_agreement'] > 0) and \
+                (x['item 2.03'] == 0):
+            return 1
+        elif (x['keywords_consummation'] > 0) and (x['item 2.03'] == 0):
+            return 1
+        elif (x['keywords_extension'] > 0) and (x['item 2.03'] == 0):
+            return 1
+        elif (x['keywords_trust'] > 0) and (x['item 2.03'] == 0):
+            return 1
+        else:
+            return 0
+
+
+def test_warrant_rules_match_reference():
+    """Test vectorized rules label random features like the classifier."""
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame({
+        '%vote_against': np.where(rng.random(n) < .5, np.nan,
+                                  rng.choice([0, .05, .1, .11, .5], n)),
+        'item 2.03': rng.integers(0, 2, n),
+    })
+    for category in ['ipo', 'loi', 'business_combination_agreement',
+                     'consummation', 'extension', 'trust']:
+        df['keywords_' + category] = rng.integers(0, 2, n) * \
+            (rng.random(n) < .3)
+    expected = df.apply(reference_classifier, axis=1).to_numpy()
+    assert (rules.WARRANT_RULES.predict(df) == expected).all()
+    assert 0 < expected.sum() < n
+
+
+def test_rule_set_from_records():
+    """Test precedence and rules added as data."""
+    rule_set = rules.RuleSet.from_records(
+        rules.WARRANT_RULES.to_records())
+    rule_set.add(rules.Rule('redeemed veto', 0, [('%redeemed', '>', .9)]),
+                 position=0)
+    df = pd.DataFrame({
+        '%vote_against': [np.nan, .2, np.nan],
+        '%redeemed': [.95, 0, 0],
+        'item 2.03': [0, 0, 0],
+        'keywords_ipo': [0, 0, 0],
+        'keywords_loi': [1, 1, 1],
+        'keywords_business_combination_agreement': [0, 0, 0],
+        'keywords_consummation': [0, 0, 0],
+        'keywords_extension': [0, 0, 0],
+        'keywords_trust': [0, 0, 0],
+    })
+    assert rule_set.predict(df).tolist() == [0, 0, 1]
+    assert rules.WARRANT_RULES.predict(df).tolist() == [1, 0, 1]
+    assert rule_set.predict(df.iloc[:0]).tolist() == []
@@ -1,10 +1,19 @@
 from order import Order
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, List
 import urllib3
 from urllib3.exceptions import InsecureRequestWarning
+from urllib3.util.retry import Retry
 urllib3.disable_warnings(category=InsecureRequestWarning)
 
+# Gateway connection settings, as in sec_scraper.session.SessionPool.
+GATEWAY_POOL_SIZE = 4
+GATEWAY_RETRIES = 3
+GATEWAY_BACKOFF_FACTOR = 0.5
+GATEWAY_TIMEOUT = 10
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
 class IBClient(object):
     def __init__(self):
         # Account info
@@ -14,6 +23,29 @@ class IBClient(object):
         self.ib_gateway_path = 'https://localhost:5000'
         self.api_version = 'v1'
 
+        # pooled keep-alive session to the gateway. Idempotent requests answered with 429 or 5xx are retried
+        # with exponential backoff, honouring any Retry-After header
+        self.timeout = GATEWAY_TIMEOUT
+        retry = Retry(total=GATEWAY_RETRIES, backoff_factor=GATEWAY_BACKOFF_FACTOR,
+                      status_forcelist=RETRY_STATUS_CODES, raise_on_status=False)
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GATEWAY_POOL_SIZE, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.requests_sent = 0
+
+    def stats(self) -> Dict:
+        """Connection reuse metrics of the gateway session.
+        The number of requests that reused an open connection is an estimate: requests sent minus
+        connections opened. Retries are not counted as requests.
+        Returns:
+        ----
+        {Dict} -- Number of requests sent, connections opened and (approximate) requests reused.
+        """
+        pools = self.adapter.poolmanager.pools
+        connections = sum(pools[key].num_connections for key in list(pools.keys()))
+        return {'requests': self.requests_sent, 'connections': connections,
+                'reused': max(self.requests_sent - connections, 0)}
+
     def _build_url(self, endpoint: str) -> str:
         """Builds a url for a request.
         Arguments:
@@ -53,25 +85,27 @@ class IBClient(object):
         # make sure it's a JSON String
         headers = {'Content-Type':'application/json'}
 
+        self.requests_sent += 1
+
         # Scenario 1: POST with a payload
         if req_type == 'POST' and params is not None:
-            response = requests.post(url, headers = headers, json=params, verify = False)
+            response = self.session.post(url, headers = headers, json=params, verify = False, timeout = self.timeout)
 
         # SCENARIO 2: POST without a payload
         elif req_type == 'POST' and params is None:
-            response = requests.post(url, headers = headers, verify = False)
+            response = self.session.post(url, headers = headers, verify = False, timeout = self.timeout)
 
         # SCENARIO 3: GET without parameters
         elif req_type == 'GET' and params is None:
-            response = requests.get(url, headers = headers, verify = False)
+            response = self.session.get(url, headers = headers, verify = False, timeout = self.timeout)
 
          # SCENARIO 4: GET with parameters
         elif req_type == 'GET' and params is not None:
-            response = requests.get(url, headers = headers, params = params, verify = False)
+            response = self.session.get(url, headers = headers, params = params, verify = False, timeout = self.timeout)
 
          # SCENARIO 5: DELETE (does not accept parameters)
         elif req_type == 'DELETE':
-            response = requests.delete(url, headers = headers, verify = False)
+            response = self.session.delete(url, headers = headers, verify = False, timeout = self.timeout)
 
         # grab the status code
         status_code = response.status_code
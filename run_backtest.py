@@ -8,8 +8,10 @@ def main():
     sec_map = sec_scraper.SEC()
     company_name = sec_map.get_name_by_ticker(ticker)
     cik = sec_map.get_cik_by_ticker(ticker)
-    co = sec_scraper.Company(company_name, cik)
-    filings = co.get_all_filings("8-K", no_of_documents=100)
+    co = sec_scraper.Company(company_name, cik,
+                             cache=sec_scraper.DocumentCache())
+    # Documents are downloaded as the strategy reaches each filing.
+    filings = co.iter_filings("8-K", no_of_documents=100, lazy=True)
 
     cerebro = bt.Cerebro(cheat_on_open=True)
     data_feed = data.create_data_feed("data/prices_td/%sW_prices.csv" % ticker)
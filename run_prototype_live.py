@@ -1,4 +1,9 @@
-import collections
+from classification import KEYWORDS
+from classification.keywords import KEYWORD_MATCHER
+from classification.preprocess import (BASIC_TRANSLATION, TAB_QUOTE_TRANSLATION, VOTE_RESULT_COLUMNS, SplicedText,
+                                       build_item_flags, normalize_text, parse_item_spans, parse_redemptions_series,
+                                       parse_vote_results_series, remove_forward_looking_statements)
+from classification.rules import WARRANT_RULES
 from datetime import datetime as dt
 from datetime import timedelta
 from email.mime.text import MIMEText
@@ -10,7 +15,6 @@ import nltk
 nltk.data.path.append('nltk/nltk_data')
 import numpy as np
 import pandas as pd
-import re
 import requests
 import sec_scraper
 import smtplib
@@ -18,6 +22,25 @@ import ssl
 import time
 pd.set_option("display.max_rows", None, "display.max_columns", None)
 
+# high-water marks of scraped 8-Ks, so each run only downloads new filings. set to None to always re-scrape.
+# lambda can only write to /tmp, which persists between warm invocations
+SYNC_STATE_PATH = '/tmp/spac_sync_state.json'
+# snapshots of sec ticker/cik mapping files, downloaded on cold start and revalidated once a day
+SEC_MAPPING_DIR = '/tmp/sec_mappings'
+# directory of trained models (spac_model_registry), the registered live model scores 8-Ks.
+# set to None to classify 8-Ks with the rule based classifier.
+MODEL_REGISTRY_DIR = None
+# item definitions: https://www.sec.gov/fast-answers/answersform8khtm.html
+# item faq: https://media2.mofo.com/documents/faq-form-8-k.pdf
+ITEM_FEATURES = ['item 1.01','item 1.02','item 1.03','item 1.04','item 2.01','item 2.02','item 2.03',
+                 'item 2.04','item 2.05','item 2.06','item 3.01','item 3.02','item 3.03','item 4.01',
+                 'item 4.02','item 5.01','item 5.02','item 5.03','item 5.04','item 5.05','item 5.06',
+                 'item 5.07','item 5.08','item 6.01','item 6.02','item 6.03','item 6.04','item 6.05',
+                 'item 7.01','item 8.01']
+
+# lambda can only write to /tmp. the store is kept in memory between warm invocations
+sec_scraper.configure_mapping_store(directory=SEC_MAPPING_DIR)
+
 def get_current_spacs(file_path_current, write=False):
     """Update list of current spac tickers."""
     # existing current spac list
@@ -58,49 +81,24 @@ def get_current_spacs(file_path_current, write=False):
 
 def get_ticker_to_cik():
     """Get cik from ticker."""
-    ticker_to_cik = pd.read_csv('https://www.sec.gov/include/ticker.txt', sep='\t',
-                                header=None, names=['ticker','cik'])
-    ticker_to_cik['ticker'] = ticker_to_cik.ticker.str.upper()
-    ticker_to_cik['cik'] = ticker_to_cik.cik.astype(str)
-    return ticker_to_cik
+    return sec_scraper.get_mapping_store().load('ticker_txt')
 
 def get_cik_to_name():
     """Get company name from cik."""
-    cik_to_name = requests.get('https://www.sec.gov/files/company_tickers.json')
-    cik_to_name = json.dumps(cik_to_name.json())
-    cik_to_name = pd.read_json(cik_to_name).transpose()
-    cik_to_name['ticker'] = cik_to_name['ticker'].str.upper()
-    cik_to_name['cik_str'] = cik_to_name['cik_str'].astype(str)
+    cik_to_name = sec_scraper.get_mapping_store().load('company_tickers')
     cik_to_name.rename(columns={'cik_str':'cik'}, inplace=True)
     return cik_to_name
 
 def process_current_spacs(spac_list):
     """Process list of new spac tickers."""       
-    # get ticker to cik and cik to company name file, then merge
-    ticker_to_cik = get_ticker_to_cik()
-    cik_to_name = get_cik_to_name()
-    spac_list = spac_list.merge(ticker_to_cik, how='left', left_on='Ticker', right_on='ticker')
-    spac_list = spac_list.merge(cik_to_name[['cik','ticker','title']], how='left', on=['cik','ticker'])
-    
-    # some current spacs have not split from units to stock + warrants so ticker in sec different
-    ticker_unit = pd.DataFrame(spac_list[spac_list.ticker.isna()]['Ticker'])
-    ticker_unit['Ticker'] = ticker_unit.Ticker + 'U'
-    ticker_unit = ticker_unit.merge(ticker_to_cik, how='left', left_on='Ticker', right_on='ticker')
-    ticker_unit = ticker_unit.merge(cik_to_name[['cik','ticker','title']], how='left', on=['cik','ticker'])
-    ticker_unit['Ticker'] = ticker_unit.Ticker.apply(lambda x: x[:-1] if not pd.isnull(x) else x)
-    ticker_unit['ticker'] = ticker_unit.ticker.apply(lambda x: x[:-1] if not pd.isnull(x) else x)
-    ticker_unit_other = pd.DataFrame(ticker_unit[ticker_unit.ticker.isna()]['Ticker'])
-    ticker_unit_other['Ticker'] = ticker_unit_other.Ticker.apply(lambda x: x+'-UN')
-    ticker_unit_other = ticker_unit_other.merge(ticker_to_cik, how='left', left_on='Ticker', right_on='ticker')
-    ticker_unit_other = ticker_unit_other.merge(cik_to_name[['cik','ticker','title']], how='left', on=['cik','ticker'])
-    ticker_unit_other['Ticker'] = ticker_unit_other.Ticker.apply(lambda x: x[:-3] if not pd.isnull(x) else x)
-    ticker_unit_other['ticker'] = ticker_unit_other.ticker.apply(lambda x: x[:-3] if not pd.isnull(x) else x)
-    ticker_unit = ticker_unit.append(ticker_unit_other)
-    ticker_unit.dropna(inplace=True)
-    
-    # append tickers found using 'U' and '-UN'
-    spac_list = spac_list[~spac_list.Ticker.isin(ticker_unit.Ticker)]
-    spac_list = spac_list.append(ticker_unit)
+    # get ticker to cik and cik to company name file, then resolve each ticker
+    # through its first matching symbol form; some current spacs have not
+    # split from units to stock + warrants so ticker in sec different
+    ticker_index = sec_scraper.build_ticker_index(get_ticker_to_cik(),
+                                                  get_cik_to_name())
+    resolved = sec_scraper.resolve_tickers(spac_list.Ticker, ticker_index)
+    spac_list = pd.concat([spac_list.reset_index(drop=True),
+                           resolved.drop(columns=['Ticker'])], axis=1)
     
     print('count current spacs:', len(spac_list))
     print('count nan in current spacs:', len(spac_list[spac_list.ticker.isna()]))
@@ -109,16 +107,18 @@ def process_current_spacs(spac_list):
 
 def basic_text_cleaning(text):
     """Basic text cleaning."""
-    text = text.replace('\n',' ').replace('\xa0',' ') # replace some unicode characters
-    text = re.sub(' +', ' ', text) # remove extra spaces
-    text = text.lower()
-    return text
+    # replace new lines and some unicode characters, remove extra spaces, lower case
+    return normalize_text(text, BASIC_TRANSLATION)
 
-def get_forms_text(company_name, cik_id, form_type):
-    """Returns dataframe of all 8-Ks for a given symbol. Columns: date, accepted_time, form, text."""
+def get_forms_text(company_name, cik_id, form_type, sync_state=None):
+    """Returns dataframe of all 8-Ks for a given symbol. Columns: date, accepted_time, form, text.
+    If sync_state (sec_scraper.SyncState) is passed, only 8-Ks not seen in a previous run are returned."""
     try:
         c = sec_scraper.Company(company_name, cik_id, timeout=20)
-        filings = c.get_all_filings(filing_type=form_type, no_of_documents=2)
+        if sync_state is None:
+            filings = c.get_all_filings(filing_type=form_type, no_of_documents=2)
+        else:
+            filings = c.get_new_filings(filing_type=form_type, sync_state=sync_state, no_of_documents=2)
     except:
         print('timed out')
         return None
@@ -136,7 +136,7 @@ def basic_text_match(df_form, substring):
     df_form[substring.replace(' ','_')+'_found'] = df_form.text.apply(lambda x: 1 if substring in x else 0)
     return df_form
 
-def agg_form_8K(spac_list, write=False):
+def agg_form_8K(spac_list, write=False, sync_state=None):
     """Returns dataframe of 8-Ks for all symbols. Columns: date, accepted_time, symbol, 
     form, text, letter_of_intent_found, business_combination_agreement_found."""
     df_form_8K_agg = pd.DataFrame()
@@ -147,7 +147,10 @@ def agg_form_8K(spac_list, write=False):
         print(row.ticker)
 
         # get form 8Ks
-        df_form_8K = get_forms_text(company_name=row.title, cik_id=row.cik, form_type='8-K')
+        df_form_8K = get_forms_text(company_name=row.title, cik_id=row.cik, form_type='8-K', sync_state=sync_state)
+        if sync_state is not None and df_form_8K is not None and len(df_form_8K)==0:
+            print('no new 8Ks since last sync, skipping...\n')
+            continue
         if df_form_8K is None or len(df_form_8K)==0:
             print('no 8Ks found (or timed out), skipping...\n')
             count_missing_8K = count_missing_8K + 1
@@ -165,6 +168,8 @@ def agg_form_8K(spac_list, write=False):
         df_form_8K_agg = df_form_8K_agg.append(df_form_8K)
 
     print('\ncount symbols missing 8-Ks:', count_missing_8K)
+    if len(df_form_8K_agg)==0:
+        return pd.DataFrame(columns=['date','text','accepted_time','symbol'])
         
     # drop duplicates on date + symbol
     # todo: if date has multipled 8-Ks, concatenate text instead of dropping
@@ -186,11 +191,7 @@ def agg_form_8K(spac_list, write=False):
 def remove_header_footer(text):
     """Remove standard header and footer from 8-K and clean text further."""
     # remove/replace some unicode characters
-    text = text.replace('\t','') # remove tabs
-    text = text.replace('\x93','"') # 1st quotation mark type
-    text = text.replace('\x94','"') # 2nd quotation mark type
-    text = text.replace('”', '"') # weird unicode/ascii conversion issue (1st quotation mark type)
-    text = text.replace('“', '"') # weird unicode/ascii conversion issue (2nd quotation mark type)
+    text = normalize_text(text, TAB_QUOTE_TRANSLATION, collapse_spaces=False, lower=False)
     
     # remove forward looking statement section
     FLS_START = [
@@ -208,17 +209,15 @@ def remove_header_footer(text):
     'conditions or circumstances on which any such statement is based, except as required by applicable law',
     'whether as a result of new information, future events, or otherwise'
     ]
-    for forward_start in FLS_START:
-        for forward_end in FLS_END:
-            ind_start = text.find(forward_start)
-            ind_end = text.find(forward_end)
-            if ind_start!=-1 and ind_end!=-1:
-                text = text[0:ind_start] + text[ind_end+len(forward_end):]
+    header = 'financial accounting standards provided pursuant to section 13(a) of the exchange act'
+    footer = 'signature pursuant to the requirements of the securities exchange act of 1934'
+    spliced = SplicedText(text)
+    remove_forward_looking_statements(spliced, FLS_START, FLS_END)
 
     # remove everything in header and footer
-    ind_start = text.find('financial accounting standards provided pursuant to section 13(a) of the exchange act')
-    ind_end = text.find('signature pursuant to the requirements of the securities exchange act of 1934')
-    text = text[ind_start:ind_end]
+    ind_start = spliced.find(header)
+    ind_end = spliced.find(footer)
+    text = spliced.slice(ind_start, ind_end)
     
     # additional text to remove
     text_to_remove = [
@@ -231,201 +230,38 @@ def remove_header_footer(text):
 
 def get_item_subheaders(text, subheaders_only):
     """Returns either list of subheaders in 8-K or list of subheaders content."""
-    subheaders = re.findall('item [0-9]+\.[0-9]+', text)
-    subheaders = list(collections.OrderedDict.fromkeys(subheaders)) # handle cases where subheader mentioned in content
-    subtexts = []
-    for i in range(0,len(subheaders)):
-        if i+1==len(subheaders):
-            subtext = text[text.find(subheaders[i]):]
-        else:
-            subtext = text[text.find(subheaders[i]):text.find(subheaders[i+1])]
-        if 'item 9.01 financial statements and exhibits' in subtext:
-            continue
-        else:
-            subtexts.append(subtext)
+    # one pass over item subheaders, first occurrence handles cases where subheader mentioned in content
+    spans = parse_item_spans(text, sort=False, include_subheader=True)
     
     # drop these items (useless text)
     drop_item_list = ['item 9.01']
     
     if subheaders_only:
-        return [x for x in subheaders if x not in drop_item_list]
-    return subtexts
-
-def count_keywords(x, keywords):
-    """Count number of occurences of keywords in keyword list."""
-    count = 0
-    for keyword in keywords:
-        count = count + x.count(keyword)
-    return count
+        return [x for x in spans if x not in drop_item_list]
+    return [text[start:end] for start, end in spans.values()
+            if text.find('item 9.01 financial statements and exhibits', start, end) == -1]
 
 def add_subheader_item_features(df_ret, item_features):
     """Add binary subheader features, 1 if subheader in text and 0 otherwise."""
-    for col in item_features:
-        df_ret[col] = 0
-    for i in range(0, len(df_ret)):
-        text = df_ret.loc[i]['text']
-        items = get_item_subheaders(text, subheaders_only=True)
-        for item in items:
-            df_ret.loc[i,item] = 1
+    flags = build_item_flags(df_ret['text'], item_features)
+    df_ret[item_features] = pd.DataFrame(flags, index=df_ret.index, columns=item_features)
     return df_ret
 
-def convert_vote_count_to_int(x):
-    """Convert vote string to int."""
-    # to indicate 0 votes, sometimes 8-K has dash (two types) instead of 0
-    if '—' in x or '-' in x or 'n/a' in x:
-        return 0
-    try:
-        x = int(x.replace(',',''))
-    except:
-        return np.nan
-    return x
-
-def parse_vote_results(x):
-    """Return votes for, votes against, abstain and broker non-votes."""
-    # find strings in text. use first if multiple matches
-    VOTE_HEADER = [
-        'for against abstain broker non-votes',
-        'for against abstain broker non-vote',
-        'for against abstention broker non-votes',
-        'for against abstention broker non-vote',
-        'for against abstentions broker non-votes',
-        'for against abstentions broker non-vote'
-    ]
-    # find phrases preceding vote results in text
-    vote_strings = [vote_string for vote_string in VOTE_HEADER if vote_string in x['text']]
-
-    # parse votes for, votes against, votes abstain, votes broker non votes
-    if len(vote_strings)==0:
-        return pd.Series([np.nan, np.nan, np.nan, np.nan])
-    else:
-        vote_string = vote_strings[0] # use first if multiple matches
-        vote_index = x['text'].find(vote_string)
-        vote_data = x['text'][(vote_index + len(vote_string)):].lstrip().split(' ')
-        votes_for = convert_vote_count_to_int(vote_data[0])
-        votes_against = convert_vote_count_to_int(vote_data[1])
-        votes_abstain = convert_vote_count_to_int(vote_data[2])
-        votes_broker_non_votes = convert_vote_count_to_int(vote_data[3])
-        if np.isnan(votes_for) or np.isnan(votes_against) or np.isnan(votes_abstain) or np.isnan(votes_broker_non_votes):
-            print('something wrong with parse_vote_results for', x.symbol, 'on', x.date)
-        return pd.Series([votes_for, votes_against, votes_abstain, votes_broker_non_votes])
-    return pd.Series([np.nan, np.nan, np.nan, np.nan])
-
-def parse_redemptions(x):
-    REDEMPTION_HEADER = [
-        'in connection with the extension',
-        'in connection with the closing',
-        'in advance of the special meeting',
-        'in connection with the special meeting',
-        'exercised their right'
-    ]
-    for redemption_phrase in REDEMPTION_HEADER:
-        redemption_sentence = [sentence for sentence in x.text.split('.') if
-                               redemption_phrase in sentence
-                               and ('redeem' in sentence or 'redemp' in sentence)]
-        if len(redemption_sentence)>0:
-            break
-    if len(redemption_sentence)==0:
-        return np.nan
-    redemption_sentence = redemption_sentence[0].lstrip().replace(',','')
-    redemption_sentence = re.sub(r'[\$]{1}[\d,]+\.?\d{0,2}', '', redemption_sentence) # replace $_#_
-    shares_regex_strong = re.findall('[0-9]+ shares', redemption_sentence)
-    shares_regex_weak = re.findall('[0-9]+', redemption_sentence)
-    # case: just one number in sentence. assume this number is redemption number
-    if len(shares_regex_weak)==1:
-        shares = int(shares_regex_weak[0])
-    # case: more than one number in sentence. if '[0-9]+ shares' then assume this is redemption number, otherwise nan
-    elif len(shares_regex_weak)>1:
-        if len(shares_regex_strong)==1:
-            shares = int(shares_regex_strong[0].replace('shares','').replace(' ',''))
-        else:
-            shares = np.nan
-    # case: no numbers in sentence.
-    else:
-        if 'none' in redemption_sentence:
-            shares = 0
-        else:
-            shares = np.nan
-    return shares
-
 def add_self_engineered_features(df_ret):
     """Add self engineered features from keyword lists."""
-    # define key word lists
-    keywords_list_loi = [
-    'entry into a letter of intent',
-    'entry into a non-binding letter of intent',
-    'enter into a letter of intent',
-    'enter into a non-binding letter of intent',
-    'entered into a letter of intent',
-    'entered into a non-binding letter of intent',
-    'entering into a letter of intent',
-    'entering into a non-binding letter of intent',
-    'execution of a letter of intent',
-    'execution of a non-binding letter of intent',
-    'execute a letter of intent',
-    'execute a non-binding letter of intent',
-    'executed a letter of intent',
-    'executed a non-binding letter of intent',
-    'executing a letter of intent',
-    'executing a non-binding letter of intent'
-    ]
-    keywords_list_business_combination_agreement = [
-    '("business combination agreement")',
-    '(the "business combination agreement")',
-    '("business combination")',
-    '(the "business combination")',
-    'entry into a definitive agreement',
-    'enter into a definitive agreement',
-    'entered into a definitive agreement',
-    'entering into a definitive agreement',
-    'business combination proposal was approved'
-    ]
-    keywords_list_extension = [
-    '(the "extension")',
-    '(the "extension amendment")',
-    'extended the termination date',
-    'extend the date by which the company must consummate',
-    'extend the date by which the company has to complete',
-    '(the "extension amendment proposal")',
-    '(the "extended termination date")'
-    ]
-    keywords_list_consummation = [
-    'announcing the consummation',
-    'consummated the previously announced business combination'
-    ]
-    keywords_list_ipo = [
-    'consummated its initial public offering ("ipo")',
-    'consummated its initial public offering (the "ipo")',
-    'consummated an initial public offering ("ipo")',
-    'consummated an initial public offering (the "ipo")',
-    'consummated the initial public offering ("ipo")',
-    'consummated the initial public offering (the "ipo")',
-    'completed its initial public offering ("ipo")',
-    'completed its initial public offering (the "ipo")',
-    'in connection with its initial public offering ("ipo") was declared effective',
-    'in connection with its initial public offering (the "ipo") was declared effective',
-    'consummated the ipo',
-    'in connection with the closing of the ipo',
-    'closing of the initial public offering (the "ipo")',
-    'consummation of the ipo'
-    ]
-    keywords_list_trust = [
-    'trust account'
-    ]
-    
-    # compute counts
-    df_ret['keywords_loi'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_loi))
-    df_ret['keywords_business_combination_agreement'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_business_combination_agreement))
-    df_ret['keywords_extension'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_extension))
-    df_ret['keywords_consummation'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_consummation))
-    df_ret['keywords_ipo'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_ipo))
-    df_ret['keywords_trust'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_trust))
+    # compute counts of all keyword lists, matched in a single scan per text. registered models are trained on
+    # all of them, see spac_machine_learning.add_text_features
+    keyword_counts = pd.DataFrame(
+        [KEYWORD_MATCHER.match(text).counts for text in df_ret.text],
+        index=df_ret.index, columns=list(KEYWORDS))
+    for category in KEYWORDS:
+        df_ret['keywords_' + category] = keyword_counts[category]
 
     # add vote results (d.n.e for most 8-Ks, fill with nan)
-    df_ret['votes_for'] = np.nan
-    df_ret['votes_against'] = np.nan
-    df_ret['votes_abstain'] = np.nan
-    df_ret['votes_broker_non_votes'] = np.nan
-    df_ret[['votes_for', 'votes_against', 'votes_abstain', 'votes_broker_non_votes']] = df_ret.apply(lambda x: parse_vote_results(x), axis=1)
+    votes = parse_vote_results_series(df_ret.text)
+    for i in np.flatnonzero(votes.vote_parse_error):
+        print('something wrong with parse_vote_results for', df_ret.symbol.iloc[i], 'on', df_ret.date.iloc[i])
+    df_ret[VOTE_RESULT_COLUMNS] = votes[VOTE_RESULT_COLUMNS]
     df_ret['vote_total'] = df_ret['votes_for'] + df_ret['votes_against'] + df_ret['votes_abstain'] + df_ret['votes_broker_non_votes']
     df_ret['%votes_for'] = df_ret['votes_for'] / df_ret['vote_total']
     df_ret['%vote_against'] = df_ret['votes_against'] / df_ret['vote_total']
@@ -433,30 +269,26 @@ def add_self_engineered_features(df_ret):
     df_ret['%votes_broker_non_votes'] = df_ret['votes_broker_non_votes'] / df_ret['vote_total']
     
     # add shares redeemed (d.n.e for most 8-Ks, fill with nan)
-    df_ret['redeemed_shares'] = df_ret.apply(lambda x: parse_redemptions(x), axis=1)
+    df_ret['redeemed_shares'] = parse_redemptions_series(df_ret.text)
     df_ret[r'%redeemed'] = df_ret['redeemed_shares'] / df_ret['vote_total']
     
     return df_ret
 
-def classifier(x):
-    """Rule based model to classify 8-K as 1 (buy warrant) or 0 (do nothing)."""
-    if ~np.isnan(x['%vote_against']) and (x['%vote_against'] > .10):
-        return 0
-    elif x['keywords_ipo'] > 0:
-        return 0
-    else:
-        if (x['keywords_loi'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_business_combination_agreement'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_consummation'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_extension'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_trust'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        else:
-            return 0
+def build_features(df_form_8K_agg):
+    """Returns dataframe of features of 8-Ks for the prediction step, one row per 8-K."""
+    df_features = df_form_8K_agg.copy()
+
+    # remove header and footer
+    df_features['text'] = df_features.text.apply(lambda x: remove_header_footer(x))
+
+    # add subheader item binary features
+    df_features = add_subheader_item_features(df_ret=df_features, item_features=ITEM_FEATURES)
+
+    # add self engineered features
+    df_features = add_self_engineered_features(df_ret=df_features)
+
+    # drop unused features for prediction step
+    return df_features.drop(['symbol','date','accepted_time','text'], axis=1)
 
 def scrape_gnn(spac_list):
     """Parse Global Newswire RSS feed. Returns dataframe of articles containing SPAC tickers."""
@@ -554,6 +386,12 @@ def send_email(df_new_8Ks, df_pred_pos, df_gnn):
         print('\nemail sent')
 
 def main():
+    # load registered model once at startup
+    live_model = None
+    if MODEL_REGISTRY_DIR is not None:
+        from spac_model_registry import LIVE_MODEL_NAME, ModelRegistry # needs sklearn, only with a registry
+        live_model = ModelRegistry(MODEL_REGISTRY_DIR).load(LIVE_MODEL_NAME)
+
     # load and update current spac list
     start_time = time.time()
     spac_list_current = get_current_spacs(file_path_current='data/spac_list_current.csv', write=True)
@@ -566,8 +404,14 @@ def main():
 
     # get returns following 8-Ks for current spacs
     start_time = time.time()
-    df_form_8K_agg = agg_form_8K(spac_list=spac_list_current, write=False)
+    sync_state = None if SYNC_STATE_PATH is None else sec_scraper.SyncState(SYNC_STATE_PATH)
+    df_form_8K_agg = agg_form_8K(spac_list=spac_list_current, write=False, sync_state=sync_state)
     print('\nfinished scraping 8-Ks, time elapsed:', np.round(time.time() - start_time, 0), 'seconds')
+    if len(df_form_8K_agg)==0:
+        print('\nno new 8-Ks since last run\n')
+        if sync_state is not None:
+            sync_state.save()
+        return
 
     # get 8-Ks added yesterday or today
     min_date = (dt.today()-timedelta(days=1)).strftime('%Y-%m-%d')
@@ -580,31 +424,13 @@ def main():
         print(df_new_8Ks, '\n')
 
     # features dataframe
-    df_features = df_form_8K_agg.copy()
-
-    # remove header and footer
-    df_features['text'] = df_features.text.apply(lambda x: remove_header_footer(x))
-
-    # define item features
-    # item definitions: https://www.sec.gov/fast-answers/answersform8khtm.html
-    # item faq: https://media2.mofo.com/documents/faq-form-8-k.pdf
-    item_features = ['item 1.01','item 1.02','item 1.03','item 1.04','item 2.01','item 2.02','item 2.03',
-                     'item 2.04','item 2.05','item 2.06','item 3.01','item 3.02','item 3.03','item 4.01',
-                     'item 4.02','item 5.01','item 5.02','item 5.03','item 5.04','item 5.05','item 5.06',
-                     'item 5.07','item 5.08','item 6.01','item 6.02','item 6.03','item 6.04','item 6.05',
-                     'item 7.01','item 8.01']
-
-    # add subheader item binary features
-    df_features = add_subheader_item_features(df_ret=df_features, item_features=item_features)
-
-    # add self engineered features
-    df_features = add_self_engineered_features(df_ret=df_features)
-
-    # drop unused features for prediction step
-    df_features = df_features.drop(['symbol','date','accepted_time','text'], axis=1)
+    df_features = build_features(df_form_8K_agg)
 
     # prediction step
-    y_pred = df_features.apply(lambda x: classifier(x), axis=1)
+    if live_model is None:
+        y_pred = WARRANT_RULES.predict(df_features)
+    else:
+        y_pred = live_model.predict(df_features)
 
     # positive label predictions
     df_pred_pos = df_form_8K_agg.loc[np.where(y_pred==1)[0],]
@@ -633,6 +459,10 @@ def main():
         # send email
         send_email(df_new_8Ks, df_pred_pos, df_gnn)
 
+    # save high-water marks only once 8-Ks are classified and sent, so a failed run scrapes them again
+    if sync_state is not None:
+        sync_state.save()
+
 def lambda_handler(event, context):
     """AWS Lambda requires a lambda_handler function."""
     main()
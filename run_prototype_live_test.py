@@ -0,0 +1,49 @@
+import glob
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# live lambda dependencies
+pytest.importorskip('feedparser')
+pytest.importorskip('lxml')
+pytest.importorskip('nltk')
+
+import run_prototype_live
+import spac_machine_learning
+from sklearn.linear_model import LogisticRegression
+from spac_model_registry import LIVE_MODEL_NAME, ModelRegistry
+
+
+@pytest.fixture
+def filings():
+    """8-Ks of test documents, as aggregated by agg_form_8K."""
+    filepaths = sorted(glob.glob(os.path.join(
+        os.path.dirname(__file__), 'classification', 'data_test', '*',
+        '*.txt')))
+    texts = [open(file, 'r').read() for file in filepaths]
+    return pd.DataFrame({
+        'date': '2021-01-04',
+        'text': texts,
+        'accepted_time': '2021-01-04 16:05:00',
+        'symbol': ['S%d' % i for i in range(len(texts))],
+    })
+
+
+def test_registered_model_scores_live_features(filings, tmp_path):
+    """Test live features have all columns of models trained on
+    build_warrant_feature_matrix."""
+    df_train = filings.copy()
+    df_train['url'] = ''
+    df_train = spac_machine_learning.add_text_features(
+        df_train, spac_machine_learning.FEATURES_ITEMS, n_jobs=1)
+    X = spac_machine_learning.build_warrant_feature_matrix(df_train)
+    y = np.arange(len(X)) % 2
+    model = LogisticRegression().fit(X.matrix, y)
+    registry = ModelRegistry(str(tmp_path))
+    registry.save(LIVE_MODEL_NAME, model, X.columns)
+
+    df_features = run_prototype_live.build_features(filings)
+    y_pred = registry.load(LIVE_MODEL_NAME).predict(df_features)
+    assert len(y_pred) == len(filings)
+    assert set(y_pred) <= {0, 1}
@@ -31,28 +31,25 @@ def get_current_spac_tickers(file_path):
 def main():
     # Instantiate SEC map.
     sec_map = sec_scraper.SEC()
+    cache = sec_scraper.DocumentCache()
 
     # File paths.
     file_path_current = 'data/spac_list_current.csv'
     file_path_past = 'data/spac_list_past.csv'
 
-    for spac in get_old_spac_tickers(file_path_past):
+    # Resolve all tickers in one batch lookup.
+    spacs = sec_map.get_ciks_by_tickers(get_old_spac_tickers(file_path_past))
+    for spac, cik, company_name in spacs.itertuples(index=False):
         print(spac)
-        try:
-            company_name = sec_map.get_name_by_ticker(spac)
-            cik = sec_map.get_cik_by_ticker(spac)
-        except ValueError:
+        if pd.isna(cik) or pd.isna(company_name):
             continue
 
         # Track file path for company
         file_path_company = BASE_PATH + "/%s" % spac
 
-        # Get filings.
-        c = sec_scraper.Company(company_name, cik)
-        filings = c.get_all_filings("8-K")
-
-        # Dump out text data.
-        for filing in filings:
+        # Get filings and dump out text data as each one is downloaded.
+        c = sec_scraper.Company(company_name, cik, cache=cache)
+        for filing in c.iter_filings("8-K"):
             file_path_filing = file_path_company + "/%s" % filing.accepted_date
             if not os.path.exists(file_path_filing):
                 os.makedirs(file_path_filing)
@@ -1,2 +1,12 @@
-from .company import Company
+from .cache import (DocumentCache, configure_document_cache,
+                    get_document_cache)
+from .company import Company, get_all_filings_concurrent
+from .index import (IndexEntry, cik_key, get_index_filings,
+                    iter_daily_index, iter_quarterly_index)
+from .mappings import (MappingStore, configure_mapping_store,
+                       get_mapping_store)
 from .sec import SEC
+from .rate_limit import EDGAR_RATE_LIMITER
+from .sync import SyncState
+from .tickers import build_ticker_index, resolve_tickers
+from .session import SessionPool, configure_session, get_session
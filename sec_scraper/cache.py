@@ -0,0 +1,165 @@
+from typing import Optional
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_DIR = "data/edgar_cache"
+DEFAULT_MAX_BYTES = 1024 ** 3
+# Evict down to this fraction of max_bytes, so eviction is not run on
+# every write once the cache is full.
+EVICT_TO_RATIO = 0.9
+
+
+class DocumentCache(object):
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        """Initialize on-disk cache for raw EDGAR documents.
+
+        EDGAR filing pages and documents never change once accepted, so they
+        are stored gzip compressed under a hash of their url (which contains
+        the accession number). Files are written to a temporary file and
+        renamed into place, so concurrent writers, threads or processes,
+        never expose a partial file. When the cache grows past max_bytes the
+        least recently used files are deleted.
+        Args:
+            directory: String path of cache directory.
+            max_bytes: Maximum size of the cache on disk in bytes.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> str:
+        """Get path of cache file for url."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], key + ".gz")
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Get cached content of url, None if url is not cached.
+
+        Args:
+            url: String url of document.
+        Returns:
+            Bytes of raw document content.
+        """
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rb") as f:
+                content = f.read()
+            os.utime(path)
+        except (OSError, EOFError):
+            return None
+        return content
+
+    def put(self, url: str, content: bytes):
+        """Store content of url in cache.
+
+        A cache that cannot be written, e.g. on a read-only or full file
+        system, never fails the caller: the error is logged and the content
+        is not cached.
+        Args:
+            url: String url of document.
+            content: Bytes of raw document content.
+        """
+        path = self._path(url)
+        directory = os.path.dirname(path)
+        compressed = gzip.compress(content)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        except OSError as e:
+            logger.warning("could not cache %s: %s", url, e)
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException as e:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            if isinstance(e, OSError):
+                logger.warning("could not cache %s: %s", url, e)
+                return
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += len(compressed)
+            if self._size > self.max_bytes:
+                self._size = self.evict()
+
+    def size(self) -> int:
+        """Get total size of cache files in bytes."""
+        return sum(size for _, _, size in self._files())
+
+    def _files(self):
+        """Yield (path, last used time, size) of every cache file."""
+        for root, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                if not file_name.endswith(".gz"):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def evict(self) -> int:
+        """Delete least recently used files to bring cache under max_bytes.
+
+        Returns:
+            Integer size of cache in bytes after eviction.
+        """
+        files = sorted(self._files(), key=lambda file: file[1])
+        size = sum(file[2] for file in files)
+        for path, _, file_size in files:
+            if size <= self.max_bytes * EVICT_TO_RATIO:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+        return size
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    """Get the process-wide document cache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DocumentCache()
+        return _default_cache
+
+
+def configure_document_cache(**kwargs) -> DocumentCache:
+    """Replace the process-wide document cache.
+
+    Args:
+        kwargs: Arguments accepted by DocumentCache, e.g. directory or
+            max_bytes.
+    Returns:
+        The new DocumentCache object.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = DocumentCache(**kwargs)
+        return _default_cache
@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from lxml import html
-from typing import List
+from typing import Iterator, List, Optional
+from sec_scraper.cache import DocumentCache
 from sec_scraper.filing import Filing
+from sec_scraper.rate_limit import EDGAR_RATE_LIMITER
+from sec_scraper.session import get_session
+from sec_scraper.sync import SyncState
 import re
 import requests
 import lxml
@@ -11,10 +16,22 @@ BASE_URL = "https://www.sec.gov"
 FILING_TYPES = ["8-K", "10-K"]
 
 
-def get_request(url: str, timeout: int) -> lxml.html.HtmlElement:
-    """Send request to server and output response in HtmlElement."""
-    page = requests.get(url, timeout=timeout)
-    return html.fromstring(page.content)
+def get_request(url: str, timeout: int,
+                cache: DocumentCache = None) -> lxml.html.HtmlElement:
+    """Send request to server and output response in HtmlElement.
+
+    If a cache is given, read the page from the cache when present, and
+    store successful responses in it otherwise. Only use a cache for
+    immutable pages, e.g. filing pages and documents under /Archives.
+    """
+    content = cache.get(url) if cache is not None else None
+    if content is None:
+        EDGAR_RATE_LIMITER.acquire()
+        page = get_session().get(url, timeout=timeout)
+        content = page.content
+        if cache is not None and page.ok:
+            cache.put(url, content)
+    return html.fromstring(content)
 
 
 def extract_date(text: str) -> str:
@@ -31,13 +48,19 @@ def extract_date_time(text: str) -> str:
 
 class Company(object):
 
-    def __init__(self, name, cik, timeout=10):
-        """Initialize company object, for pulling documents from SEC."""
+    def __init__(self, name, cik, timeout=10, cache: DocumentCache = None):
+        """Initialize company object, for pulling documents from SEC.
+
+        If a DocumentCache is given, filing pages and documents are read
+        through it. The filings index page is always requested, since it
+        changes whenever a new filing is accepted.
+        """
         self.name = name
         self.cik = cik
         self.url = ("https://www.sec.gov/cgi-bin/browse-edgar?action="
                     "getcompany&CIK=%s" % cik)
         self.timeout = timeout
+        self.cache = cache
 
     def _get(self, url: str) -> requests.Response:
         """Sends get request to given url for response object.
@@ -49,7 +72,8 @@ class Company(object):
             request.Response object which contains the server's response to an
             HTTP request.
         """
-        return requests.get(url, timeout=self.timeout)
+        EDGAR_RATE_LIMITER.acquire()
+        return get_session().get(url, timeout=self.timeout)
 
     def get_filings_url(self, filing_type: str, prior_to="",
                         ownership="include", no_of_entries=100) -> str:
@@ -92,6 +116,112 @@ class Company(object):
         page = self._get(url)
         return html.fromstring(page.content)
 
+    def get_filing_urls(self, filing_type: str, prior_to="",
+                        ownership="include",
+                        no_of_documents=100) -> List[str]:
+        """Get urls of the filing index pages listed for the company.
+
+        Args:
+            filing_type: String value for document filing type.
+            prior_to: Date constraint on documents.
+            ownership: TODO: figure out what this means.
+            no_of_documents: Number of documents to show on the webpage.
+        Returns:
+            List of string urls, most recent filing first.
+        """
+        filings_page = self.get_filings_page(
+            filing_type=filing_type,
+            prior_to=prior_to,
+            ownership=ownership,
+            no_of_entries=no_of_documents
+        )
+        elems = filings_page.xpath(
+            '//*[@id="documentsbutton"]')[:no_of_documents]
+        return [BASE_URL + elem.attrib["href"] for elem in elems]
+
+    def get_document(self, document_url: str) -> str:
+        """Get text content of document."""
+        return get_request(document_url, self.timeout,
+                           self.cache).text_content()
+
+    def get_filing(self, filing_url: str, filing_type: str,
+                   lazy=False) -> Filing:
+        """Get filing and the text of its primary document.
+
+        Args:
+            filing_url: String url of the filing index page.
+            filing_type: String value for document filing type.
+            lazy: Boolean, if True the primary document is only downloaded
+                when the documents of the filing are first accessed.
+        Returns:
+            Filing object, which contains text of the primary document.
+        """
+        filing_page = get_request(filing_url, self.timeout, self.cache)
+        filing_page_content = filing_page.find_class("formContent")[
+                0].text_content()
+
+        # Get the relevant dates.
+        filing_date = extract_date(
+            re.search("Filing Date\n(.*)\n",
+                      filing_page_content).group(1))
+        filing_date = datetime.strptime(
+            filing_date, '%Y-%m-%d')
+
+        accepted_date = extract_date_time(
+            re.search("Accepted\n(.*)\n",
+                      filing_page_content).group(1))
+        accepted_date = datetime.strptime(
+            accepted_date, '%Y-%m-%d %H:%M:%S')
+
+        period_of_report = extract_date(
+            re.search("Period of Report\n(.*)\n",
+                      filing_page_content).group(1))
+
+        # Extract text from documents in filing.
+        document_url = (BASE_URL + filing_page.xpath(
+            '//*[@id="formDiv"]/div/table/tr[2]/td[3]/a')[0].attrib[
+            "href"]).replace('/ix?doc=', '')
+        documents = None if lazy else [self.get_document(document_url)]
+
+        # Construct filing object.
+        return Filing(
+            filing_type=filing_type,
+            url=filing_url,
+            filing_date=filing_date,
+            accepted_date=accepted_date,
+            period_of_report=period_of_report,
+            documents=documents,
+            document_urls=[document_url],
+            document_loader=self.get_document
+        )
+
+    def iter_filings(self, filing_type: str, prior_to="",
+                     ownership="include", no_of_documents=100,
+                     lazy=False) -> Iterator[Filing]:
+        """Iterate over filings of certain type as they are downloaded.
+
+        Unlike get_all_filings, each filing is yielded as soon as it is
+        downloaded, so consumers can start work right away and only hold the
+        filings they keep.
+        Args:
+            filing_type: String value for document filing type.
+            prior_to: Date constraint on documents.
+            ownership: TODO: figure out what this means.
+            no_of_documents: Number of documents to show on the webpage.
+            lazy: Boolean, if True documents are only downloaded when the
+                documents of a filing are first accessed.
+        Returns:
+            Iterator of filing objects, most recent first.
+        """
+        filing_urls = self.get_filing_urls(
+            filing_type=filing_type,
+            prior_to=prior_to,
+            ownership=ownership,
+            no_of_documents=no_of_documents
+        )
+        for filing_url in filing_urls:
+            yield self.get_filing(filing_url, filing_type, lazy=lazy)
+
     def get_all_filings(self, filing_type: str, prior_to="",
                         ownership="include",
                         no_of_documents=100) -> List[Filing]:
@@ -108,52 +238,97 @@ class Company(object):
             List of filing objects, each of which contains text of relevant
             documents. TODO: add all the documents, currently only uses 8-K
         """
-        filings_page = self.get_filings_page(
+        return list(self.iter_filings(
             filing_type=filing_type,
             prior_to=prior_to,
             ownership=ownership,
-            no_of_entries=no_of_documents
+            no_of_documents=no_of_documents
+        ))
+
+    def get_new_filings(self, filing_type: str, sync_state: SyncState,
+                        no_of_documents=100) -> List[Filing]:
+        """Get filings of certain type not seen in a previous sync.
+
+        Only the filings index page is requested, and only filings listed
+        after the high-water mark of the company are downloaded. The
+        high-water mark is then moved to the most recent filing. Once in
+        steady state, this costs a single request per company.
+        Args:
+            filing_type: String value for document filing type.
+            sync_state: SyncState object holding high-water marks.
+            no_of_documents: Number of documents to show on the webpage.
+        Returns:
+            List of new filing objects, most recent first.
+        """
+        filing_urls = self.get_filing_urls(
+            filing_type=filing_type,
+            no_of_documents=no_of_documents
         )
-        elems = filings_page.xpath(
-            '//*[@id="documentsbutton"]')[:no_of_documents]
+        filing_urls = sync_state.get_new_filing_urls(self.cik, filing_urls)
+        filings = [self.get_filing(filing_url, filing_type)
+                   for filing_url in filing_urls]
+        sync_state.update(self.cik, filings)
+        return filings
+
+
+def get_all_filings_concurrent(companies: List[Company], filing_type: str,
+                               prior_to="", ownership="include",
+                               no_of_documents=100, max_workers=10,
+                               sync_state: SyncState = None
+                               ) -> List[Optional[List[Filing]]]:
+    """Get all filings of certain type for many companies in parallel.
+
+    Filings index pages, filing pages and documents are downloaded on a
+    bounded thread pool. Every request still goes through the process-wide
+    EDGAR rate limiter, so the pool keeps the limit saturated without
+    exceeding it.
+    Args:
+        companies: List of company objects.
+        filing_type: String value for document filing type.
+        prior_to: Date constraint on documents.
+        ownership: TODO: figure out what this means.
+        no_of_documents: Number of documents to show on the webpage.
+        max_workers: Maximum number of requests in flight at once.
+        sync_state: SyncState object. If given, only filings newer than the
+            high-water mark of each company are downloaded, and the marks
+            are moved forward.
+    Returns:
+        List aligned with companies. Each entry is the list of filing objects
+        for that company, most recent first, or None if any request for the
+        company failed.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        url_futures = [
+            executor.submit(company.get_filing_urls, filing_type, prior_to,
+                            ownership, no_of_documents)
+            for company in companies
+        ]
+        filing_futures = []
+        for company, url_future in zip(companies, url_futures):
+            try:
+                filing_urls = url_future.result()
+            except Exception:
+                filing_futures.append(None)
+                continue
+            if sync_state is not None:
+                filing_urls = sync_state.get_new_filing_urls(company.cik,
+                                                             filing_urls)
+            filing_futures.append([
+                executor.submit(company.get_filing, filing_url, filing_type)
+                for filing_url in filing_urls
+            ])
+
         all_filings = []
-        for elem in elems:
-            filing_url = BASE_URL + elem.attrib["href"]
-            filing_page = get_request(filing_url, self.timeout)
-            filing_page_content = filing_page.find_class("formContent")[
-                    0].text_content()
-
-            # Get the relevant dates.
-            filing_date = extract_date(
-                re.search("Filing Date\n(.*)\n",
-                          filing_page_content).group(1))
-            filing_date = datetime.strptime(
-                filing_date, '%Y-%m-%d')
-
-            accepted_date = extract_date_time(
-                re.search("Accepted\n(.*)\n",
-                          filing_page_content).group(1))
-            accepted_date = datetime.strptime(
-                accepted_date, '%Y-%m-%d %H:%M:%S')
-
-            period_of_report = extract_date(
-                re.search("Period of Report\n(.*)\n",
-                          filing_page_content).group(1))
-
-            # Extract text from documents in filing.
-            document_url = (BASE_URL + filing_page.xpath(
-                '//*[@id="formDiv"]/div/table/tr[2]/td[3]/a')[0].attrib[
-                "href"]).replace('/ix?doc=', '')
-            document = get_request(document_url, self.timeout)
-
-            # Construct filing object.
-            filing = Filing(
-                filing_type=filing_type,
-                url=filing_url,
-                filing_date=filing_date,
-                accepted_date=accepted_date,
-                period_of_report=period_of_report,
-                documents=[document.text_content()]
-            )
-            all_filings.append(filing)
-        return all_filings
+        for futures in filing_futures:
+            try:
+                filings = (None if futures is None
+                           else [future.result() for future in futures])
+            except Exception:
+                filings = None
+            all_filings.append(filings)
+
+    if sync_state is not None:
+        for company, filings in zip(companies, all_filings):
+            if filings is not None:
+                sync_state.update(company.cik, filings)
+    return all_filings
@@ -1,16 +1,34 @@
 from datetime import datetime
-from typing import List
+from typing import Callable, List
 
 
 class Filing(object):
 
     def __init__(self, filing_type: str, url: str,
                  filing_date: datetime.date, accepted_date: datetime.date,
-                 period_of_report: str, documents: List[str]):
-        """Initialize filing."""
+                 period_of_report: str, documents: List[str] = None,
+                 document_urls: List[str] = None,
+                 document_loader: Callable[[str], str] = None):
+        """Initialize filing.
+
+        Either pass documents, the text of the filing documents, or
+        document_urls together with document_loader, a function mapping a
+        document url to its text. In the latter case documents are only
+        downloaded on first access of the documents attribute.
+        """
         self.filing_type = filing_type
         self.url = url
         self.filing_date = filing_date
         self.accepted_date = accepted_date
         self.period_of_report = period_of_report,
-        self.documents = documents
+        self.document_urls = document_urls
+        self._document_loader = document_loader
+        self._documents = documents
+
+    @property
+    def documents(self) -> List[str]:
+        """Get text of documents in filing, loading them if needed."""
+        if self._documents is None:
+            self._documents = [self._document_loader(url)
+                               for url in self.document_urls]
+        return self._documents
@@ -0,0 +1,209 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional
+from sec_scraper.cache import DocumentCache
+from sec_scraper.company import BASE_URL, Company
+from sec_scraper.filing import Filing
+from sec_scraper.rate_limit import EDGAR_RATE_LIMITER
+from sec_scraper.session import get_session
+import os
+
+
+INDEX_BASE_URL = BASE_URL + "/Archives/edgar/"
+INDEX_HEADER = "CIK|Company Name|Form Type|Date Filed|Filename"
+
+
+def daily_index_path(day: date) -> str:
+    """Get path of daily master index relative to the EDGAR archive."""
+    return "daily-index/%d/QTR%d/master.%s.idx" % (
+        day.year, (day.month - 1) // 3 + 1, day.strftime('%Y%m%d'))
+
+
+def quarterly_index_path(year: int, quarter: int) -> str:
+    """Get path of quarterly master index relative to the EDGAR archive."""
+    return "full-index/%d/QTR%d/master.idx" % (year, quarter)
+
+
+class IndexEntry(object):
+
+    def __init__(self, cik: str, company_name: str, form_type: str,
+                 date_filed: datetime.date, file_name: str):
+        """Initialize entry of EDGAR master index."""
+        self.cik = cik
+        self.company_name = company_name
+        self.form_type = form_type
+        self.date_filed = date_filed
+        self.file_name = file_name
+
+    @property
+    def accession(self) -> str:
+        """Get accession number, e.g. 0001213900-20-014492."""
+        return os.path.basename(self.file_name).replace(".txt", "")
+
+    @property
+    def filing_url(self) -> str:
+        """Get url of filing index page, as listed on browse-edgar pages."""
+        return "%s/Archives/edgar/data/%s/%s/%s-index.htm" % (
+            BASE_URL, self.cik, self.accession.replace("-", ""),
+            self.accession)
+
+
+def cik_key(cik) -> str:
+    """Normalize cik to the key used in EDGAR index files, e.g. "1234567".
+
+    Accepts integers, floats (e.g. ciks read into a dataframe column with
+    missing values) and strings, with or without leading zeros.
+    """
+    return str(int(float(cik)))
+
+
+def parse_index(lines: Iterable[str], form_types: Iterable[str] = None,
+                ciks: Iterable[str] = None) -> Iterator[IndexEntry]:
+    """Parse EDGAR master index.
+
+    Master index files start with a free text preamble, followed by a
+    header line, a dashed line and one pipe delimited row per filing.
+    Args:
+        lines: Lines of master index file.
+        form_types: Form types to keep, e.g. ["8-K"]. None keeps all.
+        ciks: Ciks to keep. None keeps all.
+    Returns:
+        Iterator of IndexEntry objects, in file order.
+    """
+    form_types = None if form_types is None else set(form_types)
+    ciks = None if ciks is None else {cik_key(cik) for cik in ciks}
+    lines = iter(lines)
+    for line in lines:
+        if line.strip() == INDEX_HEADER:
+            break
+    for line in lines:
+        fields = line.rstrip("\r\n").split("|")
+        if len(fields) != 5:
+            continue
+        cik, company_name, form_type, date_filed, file_name = fields
+        if form_types is not None and form_type not in form_types:
+            continue
+        if ciks is not None and cik not in ciks:
+            continue
+        date_filed = datetime.strptime(
+            date_filed.replace("-", ""), '%Y%m%d').date()
+        yield IndexEntry(cik, company_name, form_type, date_filed,
+                         file_name)
+
+
+def load_index(path: str, local_dir: str = None, offline=False,
+               timeout=10) -> str:
+    """Load EDGAR master index file.
+
+    The file is read from local_dir if a copy exists there, using the same
+    directory layout as the EDGAR archive. Otherwise it is downloaded, and
+    saved to local_dir if one is given.
+    Args:
+        path: String path relative to the EDGAR archive, see
+            daily_index_path and quarterly_index_path.
+        local_dir: String path of local mirror of index files.
+        offline: Boolean, if True never download.
+        timeout: Timeout in seconds for the download.
+    Returns:
+        String content of index file.
+    Raises:
+        FileNotFoundError if the index file does not exist locally (when
+        offline) or on EDGAR.
+    """
+    local_path = None if local_dir is None else os.path.join(local_dir, path)
+    if local_path is not None and os.path.exists(local_path):
+        with open(local_path, "r", encoding="latin-1") as f:
+            return f.read()
+    if offline:
+        raise FileNotFoundError("index %s not found in %s" % (path, local_dir))
+
+    EDGAR_RATE_LIMITER.acquire()
+    response = get_session().get(INDEX_BASE_URL + path, timeout=timeout)
+    if response.status_code in (403, 404):
+        raise FileNotFoundError("index %s not found on EDGAR" % path)
+    response.raise_for_status()
+    content = response.content.decode("latin-1")
+    if local_path is not None:
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        with open(local_path, "w", encoding="latin-1") as f:
+            f.write(content)
+    return content
+
+
+def iter_daily_index(start: date, end: date,
+                     form_types: Iterable[str] = ("8-K",),
+                     ciks: Iterable[str] = None, local_dir: str = None,
+                     offline=False) -> Iterator[IndexEntry]:
+    """Iterate over filings listed in daily indexes from start to end.
+
+    Discovery costs one request per day for all companies, instead of one
+    request per company. Days without an index (weekends, holidays, or
+    days missing from an offline mirror) are skipped.
+    Args:
+        start: First date, inclusive.
+        end: Last date, inclusive.
+        form_types: Form types to keep. None keeps all.
+        ciks: Ciks to keep, e.g. the current SPAC universe. None keeps all.
+        local_dir: String path of local mirror of index files.
+        offline: Boolean, if True only read index files from local_dir.
+    Returns:
+        Iterator of IndexEntry objects.
+    """
+    ciks = None if ciks is None else list(ciks)
+    day = start
+    while day <= end:
+        try:
+            content = load_index(daily_index_path(day), local_dir, offline)
+        except FileNotFoundError:
+            content = None
+        if content is not None:
+            for entry in parse_index(content.splitlines(), form_types, ciks):
+                yield entry
+        day += timedelta(days=1)
+
+
+def iter_quarterly_index(year: int, quarter: int,
+                         form_types: Iterable[str] = ("8-K",),
+                         ciks: Iterable[str] = None, local_dir: str = None,
+                         offline=False) -> Iterator[IndexEntry]:
+    """Iterate over filings listed in a quarterly full index.
+
+    Args:
+        year: Integer year.
+        quarter: Integer quarter, 1 to 4.
+        form_types: Form types to keep. None keeps all.
+        ciks: Ciks to keep. None keeps all.
+        local_dir: String path of local mirror of index files.
+        offline: Boolean, if True only read index files from local_dir.
+    Returns:
+        Iterator of IndexEntry objects.
+    """
+    content = load_index(quarterly_index_path(year, quarter), local_dir,
+                         offline)
+    return parse_index(content.splitlines(), form_types, ciks)
+
+
+def get_index_filings(entries: List[IndexEntry], timeout=10,
+                      cache: DocumentCache = None,
+                      max_workers=10) -> List[Optional[Filing]]:
+    """Download filings listed in index entries in parallel.
+
+    Args:
+        entries: List of IndexEntry objects.
+        timeout: Timeout in seconds for each request.
+        cache: DocumentCache object to read filings through.
+        max_workers: Maximum number of requests in flight at once.
+    Returns:
+        List of filing objects aligned with entries, None where the download
+        failed.
+    """
+    def get_filing(entry):
+        company = Company(entry.company_name, entry.cik, timeout=timeout,
+                          cache=cache)
+        try:
+            return company.get_filing(entry.filing_url, entry.form_type)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(get_filing, entries))
@@ -0,0 +1,219 @@
+from typing import Callable, Dict
+from sec_scraper.rate_limit import EDGAR_RATE_LIMITER
+from sec_scraper.session import get_session
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import pandas as pd
+
+
+URL_COMPANY_TICKERS = 'https://www.sec.gov/files/company_tickers.json'
+URL_TICKER_TXT = 'https://www.sec.gov/include/ticker.txt'
+DEFAULT_MAPPING_DIR = "data/sec_mappings"
+# SEC mapping files are regenerated about once a day.
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def parse_company_tickers(text: str) -> pd.DataFrame:
+    """Parse company_tickers.json into columns cik_str, ticker and title.
+
+    Transforms all tickers to upper case, and ciks to strings.
+    """
+    mapping = pd.read_json(io.StringIO(text)).transpose()
+    mapping.ticker = mapping.ticker.str.upper()
+    mapping.cik_str = mapping.cik_str.astype(str)
+    return mapping
+
+
+def parse_ticker_txt(text: str) -> pd.DataFrame:
+    """Parse tab separated ticker.txt into columns ticker and cik.
+
+    Transforms all tickers to upper case, and ciks to strings.
+    """
+    mapping = pd.read_csv(io.StringIO(text), sep='\t', header=None,
+                          names=['ticker', 'cik'])
+    mapping['ticker'] = mapping.ticker.str.upper()
+    mapping['cik'] = mapping.cik.astype(str)
+    return mapping
+
+
+# Mapping name -> (url, parser).
+MAPPINGS = {
+    "company_tickers": (URL_COMPANY_TICKERS, parse_company_tickers),
+    "ticker_txt": (URL_TICKER_TXT, parse_ticker_txt),
+}
+
+
+class MappingStore(object):
+
+    def __init__(self, directory=DEFAULT_MAPPING_DIR, ttl=DEFAULT_TTL,
+                 offline=False,
+                 mappings: Dict[str, tuple] = None):
+        """Initialize local snapshot store of SEC mapping files.
+
+        Each mapping is downloaded once, parsed, and saved as a pickled
+        dataframe next to a JSON file holding its ETag and fetch time. Later
+        loads read the pickle. Once a snapshot is older than ttl it is still
+        returned, and a background thread revalidates it with the server
+        using its ETag.
+        Args:
+            directory: String path of snapshot directory.
+            ttl: Number of seconds a snapshot is considered fresh.
+            offline: Boolean, if True never download.
+            mappings: Dictionary mapping name to (url, parser), defaults to
+                MAPPINGS.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        self.mappings = dict(MAPPINGS if mappings is None else mappings)
+        self._frames = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _paths(self, name: str):
+        """Get paths of snapshot and metadata files of mapping."""
+        base = os.path.join(self.directory, name)
+        return base + ".pkl", base + ".json"
+
+    def _read_meta(self, name: str) -> dict:
+        """Read metadata of mapping, empty if there is no snapshot."""
+        _, meta_path = self._paths(name)
+        try:
+            with open(meta_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, path: str, write: Callable):
+        """Write file atomically through a temporary file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def is_stale(self, name: str) -> bool:
+        """Check if snapshot of mapping is missing or older than ttl."""
+        fetched_at = self._read_meta(name).get("fetched_at")
+        return fetched_at is None or time.time() - fetched_at > self.ttl
+
+    def load(self, name: str) -> pd.DataFrame:
+        """Load mapping, from memory or local snapshot if there is one.
+
+        Args:
+            name: String name of mapping, e.g. "company_tickers".
+        Returns:
+            Copy of mapping dataframe, callers may modify it.
+        Raises:
+            FileNotFoundError if there is no snapshot and the store is
+            offline.
+        """
+        with self._lock:
+            frame = self._frames.get(name)
+        if frame is None:
+            frame_path, _ = self._paths(name)
+            if os.path.exists(frame_path):
+                frame = pd.read_pickle(frame_path)
+                with self._lock:
+                    self._frames[name] = frame
+            elif self.offline:
+                raise FileNotFoundError("mapping %s not found in %s"
+                                        % (name, self.directory))
+            else:
+                return self.refresh(name).copy()
+
+        if not self.offline and self.is_stale(name):
+            self._refresh_in_background(name)
+        return frame.copy()
+
+    def refresh(self, name: str) -> pd.DataFrame:
+        """Revalidate snapshot of mapping with the server.
+
+        The request carries the ETag of the current snapshot, if any, so an
+        unchanged file costs a 304 response and no parsing.
+        Args:
+            name: String name of mapping.
+        Returns:
+            Mapping dataframe.
+        """
+        url, parse = self.mappings[name]
+        frame_path, meta_path = self._paths(name)
+        meta = self._read_meta(name)
+        headers = {}
+        if meta.get("etag") and os.path.exists(frame_path):
+            headers["If-None-Match"] = meta["etag"]
+
+        EDGAR_RATE_LIMITER.acquire()
+        response = get_session().get(url, headers=headers)
+        os.makedirs(self.directory, exist_ok=True)
+        if response.status_code == 304:
+            frame = pd.read_pickle(frame_path)
+        else:
+            response.raise_for_status()
+            frame = parse(response.text)
+            self._write(frame_path, frame.to_pickle)
+            meta = {"url": url, "etag": response.headers.get("ETag")}
+        meta["fetched_at"] = time.time()
+
+        def write_meta(path):
+            with open(path, "w") as f:
+                json.dump(meta, f)
+        self._write(meta_path, write_meta)
+        with self._lock:
+            self._frames[name] = frame
+        return frame
+
+    def _refresh_in_background(self, name: str):
+        """Start refresh of mapping in a daemon thread, unless one runs."""
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def run():
+            try:
+                self.refresh(name)
+            except Exception:
+                # Keep serving the stale snapshot, retry on a later load.
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_mapping_store() -> MappingStore:
+    """Get the process-wide mapping store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MappingStore()
+        return _default_store
+
+
+def configure_mapping_store(**kwargs) -> MappingStore:
+    """Replace the process-wide mapping store.
+
+    Args:
+        kwargs: Arguments accepted by MappingStore, e.g. directory, ttl or
+            offline.
+    Returns:
+        The new MappingStore object.
+    """
+    global _default_store
+    with _default_store_lock:
+        _default_store = MappingStore(**kwargs)
+        return _default_store
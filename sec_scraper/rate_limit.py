@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+# SEC EDGAR fair access policy: no more than 10 requests per second.
+EDGAR_REQUESTS_PER_SECOND = 10
+
+
+class TokenBucket(object):
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """Initialize token bucket, refilled with rate tokens per second.
+
+        The bucket is safe to share across threads. Callers that find the
+        bucket empty reserve their token and sleep until it is due, so
+        concurrent callers are spaced out evenly instead of retrying.
+        Args:
+            rate: Number of tokens added to the bucket per second.
+            capacity: Maximum number of tokens the bucket can hold, i.e. the
+                largest burst allowed.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket, blocking until they are available.
+
+        Args:
+            tokens: Number of tokens to take.
+        Returns:
+            Float number of seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# Shared by every request sent to sec.gov from this process.
+EDGAR_RATE_LIMITER = TokenBucket(EDGAR_REQUESTS_PER_SECOND)
@@ -1,29 +1,47 @@
+from sec_scraper.mappings import URL_COMPANY_TICKERS, get_mapping_store
+from typing import Dict, List
 import pandas as pd
 
 
-URL_SEC_MAPPING = 'https://www.sec.gov/files/company_tickers.json'
+URL_SEC_MAPPING = URL_COMPANY_TICKERS
 
 # TODO: add "U" and "-UN" symbol parsing
 
 
+def _first_by_key(keys: pd.Series, values: pd.Series) -> Dict[str, str]:
+    """Map each key to the value of its first row."""
+    first = ~keys.duplicated(keep='first')
+    return dict(zip(keys[first], values[first]))
+
+
 def load_sec_mappings() -> pd.DataFrame:
     """Load SEC mapping information.
 
     Load in JSON file mapping cik id to ticker to company name. Transforms
     all tickers to upper case, and all data is stored in pandas dataframe.
+    The file is read from the local mapping snapshot when there is one.
     """
     # Load in SEC mapping of cik id, ticker, and title.
-    sec_mapping = pd.read_json(URL_SEC_MAPPING).transpose()
-    sec_mapping.ticker = sec_mapping.ticker.str.upper()
-    sec_mapping.cik_str = sec_mapping.cik_str.astype(str)
-    return sec_mapping
+    return get_mapping_store().load("company_tickers")
 
 
 class SEC(object):
 
     def __init__(self):
-        """Initialize function for SEC data."""
+        """Initialize function for SEC data.
+
+        Hash indexes over the mapping are built once here, so every lookup
+        below is a dictionary lookup. Where a key maps to several rows, the
+        first row in the SEC mapping wins.
+        """
         self.sec_mapping = load_sec_mappings()
+        mapping = self.sec_mapping
+        self._cik_to_name = _first_by_key(mapping.cik_str, mapping.title)
+        self._cik_to_ticker = _first_by_key(mapping.cik_str, mapping.ticker)
+        self._name_to_cik = _first_by_key(mapping.title, mapping.cik_str)
+        self._ticker_to_cik = _first_by_key(mapping.ticker, mapping.cik_str)
+        self._cik_to_tickers = mapping.groupby(
+            'cik_str', sort=False).ticker.agg(list).to_dict()
 
     def get_name_by_cik(self, cik: str) -> str:
         """Get company name from cik.
@@ -35,12 +53,10 @@ class SEC(object):
         Return:
             String value of company name.
         """
-        if cik not in self.sec_mapping.cik_str.to_list():
+        if cik not in self._cik_to_name:
             raise ValueError("cik %s not found in SEC mapping %s"
                              % (cik, URL_SEC_MAPPING))
-        else:
-            return (self.sec_mapping[self.sec_mapping.cik_str == cik].
-                    title.to_list()[0])
+        return self._cik_to_name[cik]
 
     def get_cik_by_name(self, name: str) -> str:
         """Get cik from company name.
@@ -52,12 +68,10 @@ class SEC(object):
         Return:
             String value of cik.
         """
-        if name not in self.sec_mapping.title.to_list():
+        if name not in self._name_to_cik:
             raise ValueError("name %s not found in SEC mapping %s"
                              % (name, URL_SEC_MAPPING))
-        else:
-            return (self.sec_mapping[self.sec_mapping.title == name].
-                    cik_str.to_list()[0])
+        return self._name_to_cik[name]
 
     def get_ticker_by_cik(self, cik: str) -> str:
         """Get company ticker from cik.
@@ -69,12 +83,24 @@ class SEC(object):
         Return:
             String value of ticker.
         """
-        if cik not in self.sec_mapping.cik_str.to_list():
+        if cik not in self._cik_to_ticker:
             raise ValueError("cik %s not found in SEC mapping %s"
                              % (cik, URL_SEC_MAPPING))
-        else:
-            return (self.sec_mapping[self.sec_mapping.cik_str == cik].
-                    ticker.to_list()[0])
+        return self._cik_to_ticker[cik]
+
+    def get_tickers_by_cik(self, cik: str) -> List[str]:
+        """Get all company tickers from cik.
+
+        Companies can have several tickers, e.g. for units and warrants.
+        Args:
+            cik: String value of cik.
+        Return:
+            List of string tickers, in SEC mapping order.
+        """
+        if cik not in self._cik_to_tickers:
+            raise ValueError("cik %s not found in SEC mapping %s"
+                             % (cik, URL_SEC_MAPPING))
+        return list(self._cik_to_tickers[cik])
 
     def get_cik_by_ticker(self, ticker: str) -> str:
         """Get cik from ticker.
@@ -86,12 +112,10 @@ class SEC(object):
         Return:
             String value of ticker.
         """
-        if ticker not in self.sec_mapping.ticker.to_list():
+        if ticker not in self._ticker_to_cik:
             raise ValueError("ticker %s not found in SEC mapping %s"
                              % (ticker, URL_SEC_MAPPING))
-        else:
-            return (self.sec_mapping[self.sec_mapping.ticker == ticker].
-                    cik_str.to_list()[0])
+        return self._ticker_to_cik[ticker]
 
     def get_name_by_ticker(self, ticker: str) -> str:
         """Get company from ticker.
@@ -104,3 +128,18 @@ class SEC(object):
             String value of company name.
         """
         return self.get_name_by_cik(self.get_cik_by_ticker(ticker))
+
+    def get_ciks_by_tickers(self, tickers: List[str]) -> pd.DataFrame:
+        """Get cik and company name for a list of tickers at once.
+
+        Args:
+            tickers: List of string tickers.
+        Return:
+            Dataframe with columns ticker, cik and title, one row per given
+            ticker in the same order. cik and title are NaN for tickers not
+            found in the SEC mapping.
+        """
+        resolved = pd.DataFrame({'ticker': pd.Series(tickers, dtype=object)})
+        resolved['cik'] = resolved.ticker.map(self._ticker_to_cik)
+        resolved['title'] = resolved.cik.map(self._cik_to_name)
+        return resolved
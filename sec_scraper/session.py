@@ -0,0 +1,201 @@
+from requests.adapters import HTTPAdapter
+from typing import Dict
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+from sec_scraper.rate_limit import EDGAR_RATE_LIMITER, TokenBucket
+import requests
+import threading
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 10
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Url prefixes whose retries take a token from a rate limiter, in the
+# process-wide session pool.
+DEFAULT_RATE_LIMITERS = {"https://www.sec.gov": EDGAR_RATE_LIMITER}
+
+
+class RateLimitedRetry(Retry):
+
+    def __init__(self, *args, rate_limiter: TokenBucket = None, **kwargs):
+        """Initialize retry policy taking a token before each retry.
+
+        Retries are sent by the connection pool, below callers that take a
+        token for the first attempt, so without this they would not count
+        against the rate limit.
+        Args:
+            rate_limiter: TokenBucket to take a token from before each retry.
+            args, kwargs: Arguments accepted by urllib3 Retry.
+        """
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def new(self, **kwargs) -> "RateLimitedRetry":
+        retry = super().new(**kwargs)
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def sleep(self, response=None):
+        """Sleep for the backoff, then until a token is available."""
+        super().sleep(response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+
+class SessionPool(object):
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, retries=3,
+                 backoff_factor=0.5, timeout=DEFAULT_TIMEOUT,
+                 host_timeouts: Dict[str, float] = None,
+                 headers: Dict[str, str] = None,
+                 rate_limiters: Dict[str, TokenBucket] = None):
+        """Initialize pooled HTTP session shared by all clients.
+
+        Connections are kept alive and reused per host. Idempotent requests
+        answered with 429 or 5xx are retried with exponential backoff,
+        honouring any Retry-After header sent by the server. Retries of
+        requests to urls under a prefix of rate_limiters also take a token
+        from its rate limiter, like callers do before the first attempt.
+        Args:
+            pool_size: Maximum number of connections kept open per host.
+            retries: Maximum number of retries per request.
+            backoff_factor: Backoff factor between retries, in seconds.
+            timeout: Default timeout in seconds for hosts without an entry in
+                host_timeouts.
+            host_timeouts: Dictionary mapping host name to timeout in seconds.
+            headers: Dictionary of headers sent with every request.
+            rate_limiters: Dictionary mapping url prefix, e.g.
+                "https://www.sec.gov", to TokenBucket taken from before each
+                retry of requests to urls under it.
+        """
+        self.timeout = timeout
+        self.host_timeouts = dict(host_timeouts or {})
+
+        def adapter(rate_limiter=None):
+            retry = RateLimitedRetry(total=retries,
+                                     backoff_factor=backoff_factor,
+                                     status_forcelist=RETRY_STATUS_CODES,
+                                     raise_on_status=False,
+                                     rate_limiter=rate_limiter)
+            return HTTPAdapter(pool_connections=pool_size,
+                               pool_maxsize=pool_size, max_retries=retry)
+
+        self.adapter = adapter()
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        # Requests picks the adapter of the longest matching prefix.
+        self.adapters = [self.adapter]
+        for prefix, rate_limiter in (rate_limiters or {}).items():
+            self.adapters.append(adapter(rate_limiter))
+            self.session.mount(prefix, self.adapters[-1])
+        if headers:
+            self.session.headers.update(headers)
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, timeout=None,
+                **kwargs) -> requests.Response:
+        """Send request over a pooled connection.
+
+        Args:
+            method: String HTTP method, e.g. 'GET' or 'POST'.
+            url: String url of given server.
+            timeout: Timeout in seconds, overrides the per-host timeout.
+            kwargs: Any other arguments accepted by requests.Session.request.
+        Returns:
+            request.Response object which contains the server's response to an
+            HTTP request.
+        """
+        host = urlsplit(url).hostname
+        if timeout is None:
+            timeout = self.host_timeouts.get(host, self.timeout)
+        with self._lock:
+            self._requests[host] = self._requests.get(host, 0) + 1
+        return self.session.request(method, url, timeout=timeout, **kwargs)
+
+    def get(self, url: str, timeout=None, **kwargs) -> requests.Response:
+        """Send GET request over a pooled connection."""
+        return self.request("GET", url, timeout=timeout, **kwargs)
+
+    def post(self, url: str, timeout=None, **kwargs) -> requests.Response:
+        """Send POST request over a pooled connection."""
+        return self.request("POST", url, timeout=timeout, **kwargs)
+
+    def delete(self, url: str, timeout=None, **kwargs) -> requests.Response:
+        """Send DELETE request over a pooled connection."""
+        return self.request("DELETE", url, timeout=timeout, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get connection reuse metrics per host.
+
+        The number of requests that reused an open connection is an
+        estimate: requests sent minus connections opened. It is not counted
+        per request, and retries sent by the connection pool are not counted
+        as requests.
+        Returns:
+            Dictionary mapping host name to a dictionary with the number of
+            requests sent, connections opened and (approximate) requests that
+            reused an already open connection.
+        """
+        connections = {}
+        for adapter in self.adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                try:
+                    pool = pools[key]
+                except KeyError:
+                    continue
+                connections[pool.host] = (connections.get(pool.host, 0) +
+                                          pool.num_connections)
+        with self._lock:
+            requests_sent = dict(self._requests)
+        return {
+            host: {
+                "requests": count,
+                "connections": connections.get(host, 0),
+                "reused": max(count - connections.get(host, 0), 0),
+            }
+            for host, count in requests_sent.items()
+        }
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def get_session() -> SessionPool:
+    """Get the process-wide session pool, creating it on first use.
+
+    Retries of requests to sec.gov take a token from EDGAR_RATE_LIMITER,
+    see DEFAULT_RATE_LIMITERS.
+    """
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = SessionPool(
+                rate_limiters=DEFAULT_RATE_LIMITERS)
+        return _default_session
+
+
+def configure_session(**kwargs) -> SessionPool:
+    """Replace the process-wide session pool.
+
+    Args:
+        kwargs: Arguments accepted by SessionPool, e.g. pool_size, retries,
+            backoff_factor, timeout or host_timeouts. rate_limiters defaults
+            to DEFAULT_RATE_LIMITERS.
+    Returns:
+        The new SessionPool object.
+    """
+    global _default_session
+    kwargs.setdefault("rate_limiters", DEFAULT_RATE_LIMITERS)
+    with _default_session_lock:
+        if _default_session is not None:
+            _default_session.close()
+        _default_session = SessionPool(**kwargs)
+        return _default_session
@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sec_scraper.filing import Filing
+import json
+import os
+import re
+import threading
+
+
+ACCESSION_PATTERN = re.compile(r'(\d{10}-\d{2}-\d{6})-index')
+
+
+def extract_accession(filing_url: str) -> str:
+    """Extract accession number from filing index page url."""
+    match = ACCESSION_PATTERN.search(filing_url)
+    if match is None:
+        raise ValueError("no accession number in url %s" % filing_url)
+    return match.group(1)
+
+
+class SyncState(object):
+
+    def __init__(self, path: str = None):
+        """Initialize per-cik high-water marks for incremental syncs.
+
+        A high-water mark is the accession number and accepted date of the
+        most recent filing already downloaded for a cik. Marks are loaded
+        from path if it exists, and written back to path on save.
+        Args:
+            path: String path of JSON file to persist marks in, or None to
+                keep them in memory only.
+        """
+        self.path = path
+        self.marks = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as f:
+                self.marks = json.load(f)
+
+    def get_mark(self, cik: str) -> Optional[Dict[str, str]]:
+        """Get high-water mark of cik, None if cik was never synced."""
+        with self._lock:
+            return self.marks.get(str(cik))
+
+    def get_new_filing_urls(self, cik: str,
+                            filing_urls: List[str]) -> List[str]:
+        """Get filing urls newer than the high-water mark of cik.
+
+        Args:
+            cik: String value of cik.
+            filing_urls: List of filing index page urls, most recent first.
+        Returns:
+            List of filing urls listed before the last seen accession number.
+        """
+        mark = self.get_mark(cik)
+        if mark is None:
+            return filing_urls
+        new_filing_urls = []
+        for filing_url in filing_urls:
+            if extract_accession(filing_url) == mark["accession"]:
+                break
+            new_filing_urls.append(filing_url)
+        return new_filing_urls
+
+    def update(self, cik: str, filings: List[Filing]):
+        """Move high-water mark of cik to the most recent of filings.
+
+        Args:
+            cik: String value of cik.
+            filings: List of newly downloaded filing objects.
+        """
+        if len(filings) == 0:
+            return
+        latest = max(filings, key=lambda filing: filing.accepted_date)
+        with self._lock:
+            self.marks[str(cik)] = {
+                "accession": extract_accession(latest.url),
+                "accepted_date": datetime.strftime(
+                    latest.accepted_date, '%Y-%m-%d %H:%M:%S'),
+            }
+
+    def save(self):
+        """Write high-water marks to path."""
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._lock:
+            marks = dict(self.marks)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(marks, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,72 @@
+from typing import Iterable
+import pandas as pd
+
+
+# Symbol forms tried for each ticker, most preferred first, as (rule, suffix).
+# SPACs that have not split from units into stock and warrants are only
+# listed in SEC mappings under their unit or warrant symbol.
+TICKER_RULES = [
+    ("base", ""),
+    ("unit", "U"),
+    ("unit-un", "-UN"),
+    ("warrant", "W"),
+    ("warrant-ws", ".WS"),
+]
+
+
+def build_ticker_index(ticker_to_cik: pd.DataFrame,
+                       cik_to_name: pd.DataFrame) -> pd.DataFrame:
+    """Build index of SEC symbols keyed by suffix-stripped base ticker.
+
+    Every SEC symbol ending in a suffix of TICKER_RULES is listed under its
+    base ticker, and only the most preferred match per base ticker is kept.
+    Matches through a suffix must have a company name, base matches need not.
+    Args:
+        ticker_to_cik: Dataframe with columns ticker and cik, from ticker.txt.
+        cik_to_name: Dataframe with columns cik, ticker and title, from
+            company_tickers.json.
+    Returns:
+        Dataframe indexed by base ticker, with columns sec_ticker, cik, title
+        and match_rule.
+    """
+    symbols = ticker_to_cik[['ticker', 'cik']].merge(
+        cik_to_name[['cik', 'ticker', 'title']], how='left',
+        on=['cik', 'ticker'])
+    candidates = []
+    for priority, (rule, suffix) in enumerate(TICKER_RULES):
+        if suffix:
+            matched = symbols[symbols.ticker.str.endswith(suffix) &
+                              symbols.title.notna()]
+            base = matched.ticker.str.slice(stop=-len(suffix))
+        else:
+            matched = symbols
+            base = matched.ticker
+        candidates.append(pd.DataFrame({
+            'base': base, 'sec_ticker': matched.ticker, 'cik': matched.cik,
+            'title': matched.title, 'match_rule': rule,
+            'priority': priority}))
+    index = pd.concat(candidates, ignore_index=True)
+    index = index.sort_values('priority', kind='stable')
+    index = index.drop_duplicates('base', keep='first')
+    return index.drop(columns=['priority']).set_index('base')
+
+
+def resolve_tickers(tickers: Iterable[str],
+                    ticker_index: pd.DataFrame) -> pd.DataFrame:
+    """Resolve tickers to cik and company name in one join.
+
+    Args:
+        tickers: Iterable of string tickers.
+        ticker_index: Dataframe returned by build_ticker_index.
+    Returns:
+        Dataframe with one row per ticker, in order, and columns Ticker,
+        ticker, sec_ticker, cik, title and match_rule. ticker is the given
+        ticker when it was resolved, and all columns but Ticker are NaN when
+        it was not.
+    """
+    resolved = pd.DataFrame({'Ticker': pd.Series(list(tickers),
+                                                 dtype=object)})
+    resolved = resolved.join(ticker_index, on='Ticker')
+    resolved.insert(1, 'ticker',
+                    resolved.Ticker.where(resolved.sec_ticker.notna()))
+    return resolved
@@ -12,13 +12,33 @@ import pandas as pd
 import streamlit as st
 from spac_historical_stats import plot_cumulative_return, compute_mean_returns, compute_summary_statistics
 from spac_machine_learning import (process_warrant_features, split_warrant_train_test, logistic_reg_train, decision_tree_train,
-	random_forest_train, svm_train, binary_classification_report, plot_feature_importance, trading_metrics)
+	random_forest_train, svm_train, select_models, binary_classification_report, plot_feature_importance, trading_metrics)
+from spac_feature_matrix import model_input
+from spac_feature_store import FeatureStore
+from spac_model_registry import LIVE_MODEL_NAME, ModelRegistry
 from spac_run_live import run_live_model
 from spac_web_processing import process_current_spacs, process_past_spacs, load_all_spacs, get_current_spacs
 
 
 st.title('SPAC Strategy Dashboard')
 
+# features of filings processed before are loaded instead of recomputed
+feature_store = FeatureStore()
+model_registry = ModelRegistry()
+
+
+@st.cache(allow_output_mutation=True)
+def load_live_model():
+	"""Load registered production model once per server, None to use the rule based classifier."""
+	try:
+		return model_registry.load(LIVE_MODEL_NAME)
+	except (FileNotFoundError, ValueError) as e:
+		print('using rule based classifier:', e)
+		return None
+
+
+live_model = load_live_model()
+
 option_side = st.sidebar.selectbox('Dashboard Type', ['Production Model', 'Historical Returns', 'Machine Learning Models'])
 
 if option_side == 'Production Model':
@@ -32,7 +52,8 @@ if option_side == 'Production Model':
 	if button_live:
 		spac_list_current = get_current_spacs(file_path_current='data/spac_list_current.csv')
 		st.write('Processing {:.0f} SPACs...'.format(len(spac_list_current)))
-		df_new_forms, df_buy = run_live_model(spac_list_current=spac_list_current)
+		df_new_forms, df_buy = run_live_model(spac_list_current=spac_list_current, feature_store=feature_store,
+											  model=live_model)
 		st.write('New Form 8-Ks filed since {}:'.format(df_new_forms.filing_time.min()[0:10]))
 		if len(df_new_forms) == 0:
 			st.write('No new 8-Ks')
@@ -81,14 +102,16 @@ else:
 		expander_ml.write('- What are we predicting? Whether the warrant return after n days is negative (label=0) or positive (label=1).')
 		expander_ml.write('- Why not regression models? Binary classification results are more promising.')
 		expander_ml.write('- What about multi-class classification? See https://github.com/alandu20/spac/blob/master/prototype.ipynb.')
-		ml_algos = ['Logistic Regression', 'Decision Tree', 'Support Vector Machine', 'Random Forest']
+		ml_algos = ['Logistic Regression', 'Decision Tree', 'Support Vector Machine', 'Random Forest', 'All Models']
 		option_ml = st.selectbox('Select machine learning model:', ml_algos)
 		y_variables = ['open_close_t+1_%chg', 'open_close_t+3_%chg', 'open_close_t+5_%chg', 'open_close_t+7_%chg',
 					   'open_close_t+10_%chg', 'open_close_t+12_%chg']
 		option_y = st.selectbox('Select output variable:', y_variables)
+		option_register = st.checkbox('Register trained model for production (used after dashboard restart)')
 		pressed_ml = st.button('Train model')
 		if pressed_ml:
-			df_returns = process_warrant_features(df_returns_warrants=df_returns_all_warrants, y_variable=option_y)
+			df_returns = process_warrant_features(df_returns_warrants=df_returns_all_warrants, y_variable=option_y,
+												  feature_store=feature_store)
 			X, X_train, X_test, y, y_train, y_test = split_warrant_train_test(df_returns_warrants=df_returns, y_variable=option_y)
 			
 			st.subheader('Training set')
@@ -100,19 +123,29 @@ else:
 				cv_grid_result, fig_reg_path, model = svm_train(X_train, y_train)
 			elif option_ml == 'Random Forest':
 				cv_grid_result, model = random_forest_train(X_train, y_train)
+			elif option_ml == 'All Models':
+				ranking, searches = select_models(X_train, y_train)
+				st.write('Model selection ranking (5-fold CV, TimeSeriesSplit, f1):', ranking)
+				cv_grid_result = searches[ranking.model.iloc[0]]
+				model = cv_grid_result.best_estimator_
 			else:
 				assert option_ml in ml_algos
 			st.write('Best 5-fold CV (TimeSeriesSplit) score: {:.2f} using {}'.format(cv_grid_result.best_score_, cv_grid_result.best_params_))
-			if option_ml is not 'Random Forest':
+			if option_register:
+				version = model_registry.save(LIVE_MODEL_NAME, model, X.columns,
+											  metadata={'model': option_ml, 'y_variable': option_y,
+														'cv_score': float(cv_grid_result.best_score_)})
+				st.write('Registered as {} version {}'.format(LIVE_MODEL_NAME, version))
+			if option_ml not in ['Random Forest', 'All Models']:
 				st.pyplot(fig_reg_path, use_container_width=True)
-			y_train_pred = model.predict(X_train)
+			y_train_pred = model.predict(model_input(X_train))
 			cm, cr, fig_eval_curves = binary_classification_report(model, X_train, y_train, y_train_pred)
 			st.write('Confusion matrix:\n', cm)
 			st.write(cr)
 			st.pyplot(fig_eval_curves, use_container_width=True)
 
 			st.subheader('Test set')
-			y_test_pred = model.predict(X_test)
+			y_test_pred = model.predict(model_input(X_test))
 			cm, cr, fig_eval_curves = binary_classification_report(model, X_test, y_test, y_test_pred)
 			st.write('Confusion matrix:\n', cm)
 			st.write(cr)
@@ -122,7 +155,7 @@ else:
 			st.pyplot(plot_feature_importance(model, X), use_container_width=True)
 
 			st.subheader('Trading metrics')
-			y_all_pred = model.predict(X)
+			y_all_pred = model.predict(model_input(X))
 			trades_per_month, sum_returns, mean_return, sd_return, sd_return_dn, sharpe_ratio, sortino_ratio = trading_metrics(df_returns, option_y, y_all_pred)
 			st.write('Trades / month: {:.1f}'.format(trades_per_month))
 			st.write('Sum return: {:.0f}%'.format(sum_returns*100))
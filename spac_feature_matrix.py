@@ -0,0 +1,75 @@
+"""
+    Description:
+        Sparse feature matrix of engineered features and bag of words text features, for model training
+"""
+
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class FeatureMatrix(object):
+
+    def __init__(self, matrix, columns, index=None):
+        """Initialize feature matrix kept as scipy CSR, so n-gram text features are never densified.
+
+        Models are trained and evaluated on the CSR matrix itself, see model_input.
+        Args:
+            matrix: scipy sparse matrix or 2d array, one row per filing
+            columns: feature names, one per matrix column
+            index: row labels, defaults to row positions
+        """
+        self.matrix = sp.csr_matrix(matrix, dtype=np.float64)
+        self.columns = pd.Index(columns)
+        self.index = pd.RangeIndex(self.matrix.shape[0]) if index is None else pd.Index(index)
+        if self.matrix.shape != (len(self.index), len(self.columns)):
+            raise ValueError('matrix of shape %s does not match %d rows and %d columns'
+                             % (self.matrix.shape, len(self.index), len(self.columns)))
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Returns feature matrix of numeric (dense) dataframe columns, with its index."""
+        return cls(frame.to_numpy(dtype=np.float64), frame.columns, frame.index)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def take(self, rows):
+        """Returns feature matrix of rows at positions."""
+        rows = np.asarray(rows)
+        return FeatureMatrix(self.matrix[rows], self.columns, self.index[rows])
+
+    def loc(self, labels):
+        """Returns feature matrix of rows with index labels."""
+        rows = self.index.get_indexer(labels)
+        if (rows == -1).any():
+            raise KeyError('labels not in index of feature matrix')
+        return self.take(rows)
+
+    def hstack(self, other):
+        """Returns feature matrix with columns of other appended, rows matched by index label."""
+        if not other.index.equals(self.index):
+            other = other.loc(self.index)
+        return FeatureMatrix(sp.hstack([self.matrix, other.matrix], format='csr'),
+                             self.columns.append(other.columns), self.index)
+
+    def column_sums(self):
+        """Returns series of sum of each column, skipping nan like DataFrame.sum."""
+        data = np.where(np.isnan(self.matrix.data), 0., self.matrix.data)
+        sums = np.bincount(self.matrix.indices, weights=data, minlength=self.matrix.shape[1])
+        return pd.Series(sums, index=self.columns)
+
+    def select_columns(self, mask):
+        """Returns feature matrix of columns where boolean mask is True."""
+        mask = np.asarray(mask, dtype=bool)
+        return FeatureMatrix(self.matrix[:, np.flatnonzero(mask)], self.columns[mask], self.index)
+
+
+def model_input(X):
+    """Returns what models are fit on and predict from: the CSR matrix of a feature matrix, anything else as is."""
+    return X.matrix if isinstance(X, FeatureMatrix) else X
@@ -0,0 +1,101 @@
+"""
+    Description:
+        Persistent store of per-filing features, keyed by hash of the filing text, feature code version and feature
+        parameters
+"""
+
+
+from contextlib import closing
+import hashlib
+import os
+import pandas as pd
+import sqlite3
+
+
+# bump whenever feature code changes, features stored by other versions are ignored
+FEATURE_VERSION = 1
+DEFAULT_FEATURE_STORE_PATH = 'data/feature_store.sqlite'
+# max number of keys per select, below sqlite's limit on query parameters
+SELECT_BATCH_SIZE = 500
+
+
+def filing_key(text):
+    """Returns sha1 hex digest of raw filing text."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def parameters_key(parameters):
+    """Returns short sha1 hex digest of feature parameters, a list of strings, e.g. subheader item features."""
+    return hashlib.sha1('\n'.join(parameters).encode('utf-8')).hexdigest()[:12]
+
+
+class FeatureStore(object):
+
+    def __init__(self, path=DEFAULT_FEATURE_STORE_PATH, version=FEATURE_VERSION, variant=None):
+        """Initialize SQLite feature store.
+
+        Features of each version and variant live in their own table, one row per filing key. Column names and
+        dtypes are recorded on first save, so loaded features have the dtypes they were saved with.
+        Args:
+            path: path of SQLite database file
+            version: integer feature code version
+            variant: string key of parameters the features depend on, see parameters_key and variant
+        """
+        self.path = path
+        self.version = version
+        self.table = 'features_v%d' % version if variant is None else 'features_v%d_%s' % (version, variant)
+
+    def variant(self, variant):
+        """Returns store in the same file and version for features computed with other parameters, e.g.
+        feature_store.variant(parameters_key(item_features))."""
+        return FeatureStore(self.path, self.version, variant)
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return closing(sqlite3.connect(self.path))
+
+    def _columns(self, conn):
+        """Returns dict of stored column name to dtype, in column order. Empty if nothing saved yet."""
+        conn.execute('CREATE TABLE IF NOT EXISTS feature_table_columns '
+                     '(feature_table TEXT, position INTEGER, name TEXT, dtype TEXT, PRIMARY KEY (feature_table, position))')
+        rows = conn.execute('SELECT name, dtype FROM feature_table_columns WHERE feature_table = ? ORDER BY position',
+                            (self.table,)).fetchall()
+        return dict(rows)
+
+    def load(self, keys):
+        """Returns dataframe of stored features indexed by filing key, for keys found in the store."""
+        keys = list(keys)
+        with self._connect() as conn:
+            columns = self._columns(conn)
+            if len(columns) == 0:
+                return pd.DataFrame(columns=list(columns), index=pd.Index([], name='key'))
+            quoted = ', '.join('"%s"' % name for name in columns)
+            batches = []
+            for i in range(0, len(keys), SELECT_BATCH_SIZE):
+                batch = keys[i:i+SELECT_BATCH_SIZE]
+                query = 'SELECT key, %s FROM %s WHERE key IN (%s)' % (quoted, self.table, ','.join('?' * len(batch)))
+                batches.append(pd.DataFrame(conn.execute(query, batch).fetchall(), columns=['key'] + list(columns)))
+        features = pd.concat(batches, ignore_index=True) if batches else pd.DataFrame(columns=['key'] + list(columns))
+        return features.set_index('key').astype(columns)
+
+    def save(self, features):
+        """Save features, a dataframe indexed by filing key. Rows of keys already stored are replaced."""
+        if len(features) == 0:
+            return
+        columns = {name: str(dtype) for name, dtype in features.dtypes.items()}
+        with self._connect() as conn, conn:
+            stored = self._columns(conn)
+            if len(stored) == 0:
+                conn.executemany('INSERT INTO feature_table_columns VALUES (?, ?, ?, ?)',
+                                 [(self.table, i, name, dtype) for i, (name, dtype) in enumerate(columns.items())])
+                conn.execute('CREATE TABLE IF NOT EXISTS %s (key TEXT PRIMARY KEY, %s)'
+                             % (self.table, ', '.join('"%s"' % name for name in columns)))
+            elif list(stored) != list(columns):
+                raise ValueError('features do not match columns stored in %s, bump FEATURE_VERSION' % self.table)
+            rows = [(key,) + tuple(None if pd.isna(value) else value.item() if hasattr(value, 'item') else value
+                                   for value in row)
+                    for key, row in zip(features.index, features[list(stored or columns)].itertuples(index=False))]
+            conn.executemany('INSERT OR REPLACE INTO %s VALUES (%s)' % (self.table, ','.join('?' * (len(columns) + 1))),
+                             rows)
@@ -4,21 +4,33 @@
 """
 
 
-import collections
+from classification import KEYWORDS, preprocess
+from classification.keywords import KEYWORD_MATCHER
+from classification.preprocess import (TAB_QUOTE_TRANSLATION, SplicedText, build_item_flags, normalize_text,
+                                       parse_item_spans, remove_forward_looking_statements)
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime as dt
+import copy
+import functools
+import joblib
 import matplotlib.pyplot as plt
 import numpy as np
+import os
 import pandas as pd
 import re
 from sklearn import metrics
+from sklearn.base import clone
 from sklearn.decomposition import TruncatedSVD
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv # noqa, enables HalvingGridSearchCV
 from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, confusion_matrix
-from sklearn.model_selection import GridSearchCV, TimeSeriesSplit, train_test_split
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import classification_report, confusion_matrix, get_scorer
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, TimeSeriesSplit, train_test_split
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.svm import SVC
+from spac_feature_matrix import FeatureMatrix, model_input
+from spac_feature_store import filing_key, parameters_key
 
 
 # define item features
@@ -28,16 +40,14 @@ FEATURES_ITEMS = ['item 1.01','item 1.02','item 1.03','item 1.04','item 2.01','i
                   'item 2.05','item 2.06','item 3.01','item 3.02','item 3.03','item 4.01','item 4.02','item 5.01',
                   'item 5.02','item 5.03','item 5.04','item 5.05','item 5.06','item 5.07','item 5.08','item 6.01',
                   'item 6.02','item 6.03','item 6.04','item 6.05','item 7.01','item 8.01']
+# max number of distinct tokens memoized per TextProcessor
+TOKEN_CACHE_SIZE = 2 ** 17
 
 
 def remove_header_footer(text):
     """Remove standard header and footer from 8-K and clean text further."""
     # remove/replace some unicode characters
-    text = text.replace('\t','') # remove tabs
-    text = text.replace('\x93','"') # 1st quotation mark type
-    text = text.replace('\x94','"') # 2nd quotation mark type
-    text = text.replace('”', '"') # weird unicode/ascii conversion issue (1st quotation mark type)
-    text = text.replace('“', '"') # weird unicode/ascii conversion issue (2nd quotation mark type)
+    text = normalize_text(text, TAB_QUOTE_TRANSLATION, collapse_spaces=False, lower=False)
     
     # remove forward looking statement section
     FLS_START = [
@@ -55,17 +65,15 @@ def remove_header_footer(text):
     'conditions or circumstances on which any such statement is based, except as required by applicable law',
     'whether as a result of new information, future events, or otherwise'
     ]
-    for forward_start in FLS_START:
-        for forward_end in FLS_END:
-            ind_start = text.find(forward_start)
-            ind_end = text.find(forward_end)
-            if ind_start!=-1 and ind_end!=-1:
-                text = text[0:ind_start] + text[ind_end+len(forward_end):]
+    header = 'financial accounting standards provided pursuant to section 13(a) of the exchange act'
+    footer = 'signature pursuant to the requirements of the securities exchange act of 1934'
+    spliced = SplicedText(text)
+    remove_forward_looking_statements(spliced, FLS_START, FLS_END)
 
     # remove everything in header and footer
-    ind_start = text.find('financial accounting standards provided pursuant to section 13(a) of the exchange act')
-    ind_end = text.find('signature pursuant to the requirements of the securities exchange act of 1934')
-    text = text[ind_start:ind_end]
+    ind_start = spliced.find(header)
+    ind_end = spliced.find(footer)
+    text = spliced.slice(ind_start, ind_end)
     
     # additional text to remove
     text_to_remove = [
@@ -78,81 +86,97 @@ def remove_header_footer(text):
 
 
 def get_item_subheaders(text, subheaders_only):
-    subheaders = re.findall('item [0-9]+\.[0-9]+', text)
-    subheaders = list(collections.OrderedDict.fromkeys(subheaders)) # handle cases where subheader mentioned in content
-    subtexts = []
-    for i in range(0,len(subheaders)):
-        if i+1==len(subheaders):
-            subtext = text[text.find(subheaders[i]):]
-        else:
-            subtext = text[text.find(subheaders[i]):text.find(subheaders[i+1])]
-        if 'item 9.01 financial statements and exhibits' in subtext:
-            continue
-        else:
-            subtexts.append(subtext)
+    # one pass over item subheaders, first occurrence handles cases where subheader mentioned in content
+    spans = parse_item_spans(text, sort=False, include_subheader=True)
     
     # drop these items
     drop_item_list = ['item 9.01']
     
     if subheaders_only:
-        return [x for x in subheaders if x not in drop_item_list]
-    return subtexts
-
-
-def count_keywords(x, keywords):
-    count = 0
-    for keyword in keywords:
-        count = count + x.count(keyword)
-    return count
-
-
-def text_processing(text, item_features, stemming=True):
-    subtexts = get_item_subheaders(text, subheaders_only=False)
-    tokens = []
-    for subtext in subtexts:
-        # remove item subheaders. todo: probably should remove text of subheader too
-        for item in item_features:
-            subtext = subtext.replace(item,'')
-
-        # tokenize, only keeping alphanumeric
-        subtokens = nltk.tokenize.RegexpTokenizer(r'\w+').tokenize(subtext)
-
-        # remove stop words
-        stop_words = set(nltk.corpus.stopwords.words('english'))
-        subtokens = [w for w in subtokens if not w in stop_words]
-
-        # remove numbers and chinese/other non-english characters for now
+        return [x for x in spans if x not in drop_item_list]
+    return [text[start:end] for start, end in spans.values()
+            if text.find('item 9.01 financial statements and exhibits', start, end) == -1]
+
+
+class TextProcessor(object):
+
+    def __init__(self, item_features, stemming=True, token_cache_size=TOKEN_CACHE_SIZE):
+        """Initialize tokenizer, stop words and stemmer once, for processing many documents.
+
+        The SEC vocabulary is small and repetitive, so the outcome of each distinct token (dropped as stop word or
+        non-alphabetic, or its stem) is memoized in a bounded cache.
+        Args:
+            item_features: item subheaders removed from text before tokenizing
+            stemming: if True, tokens are replaced by their porter stems
+            token_cache_size: max number of distinct tokens memoized
+        """
+        import nltk  # only needed for bag of words features
+        self.item_features = list(item_features)
+        self.stemming = stemming
+        self.token_cache_size = token_cache_size
+        self.stop_words = frozenset(nltk.corpus.stopwords.words('english'))
+        self._tokenize = nltk.tokenize.RegexpTokenizer(r'\w+').tokenize
+        self._stem = nltk.stem.porter.PorterStemmer().stem if stemming else None
+        self.process_token = functools.lru_cache(maxsize=token_cache_size)(self._process_token)
+
+    def __getstate__(self):
+        # tokenizer, stemmer and cache are rebuilt in worker processes
+        return self.item_features, self.stemming, self.token_cache_size
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def _process_token(self, token):
+        """Returns stem of token, or None if token is dropped."""
+        # remove stop words, numbers and chinese/other non-english characters for now
         # (todo: revisit later for vote count processing)
-        subtokens = [w for w in subtokens if w.encode('utf-8').isalpha()]
+        if token in self.stop_words or not token.encode('utf-8').isalpha():
+            return None
+        return self._stem(token) if self.stemming else token
+
+    def process(self, text):
+        """Returns space separated tokens of item subtexts of text."""
+        tokens = []
+        for subtext in get_item_subheaders(text, subheaders_only=False):
+            # remove item subheaders. todo: probably should remove text of subheader too
+            for item in self.item_features:
+                subtext = subtext.replace(item,'')
+            # tokenize, only keeping alphanumeric
+            for token in self._tokenize(subtext):
+                token = self.process_token(token)
+                if token is not None:
+                    tokens.append(token)
+        return ' '.join(tokens)
+
+    def _process_shard(self, texts):
+        return [self.process(text) for text in texts]
+
+    def process_corpus(self, texts, n_jobs=None):
+        """Returns list of processed texts, in order, sharded across n_jobs processes (None for all cores)."""
+        return _map_shards(self._process_shard, list(texts), n_jobs)
+
+
+@functools.lru_cache(maxsize=None)
+def get_text_processor(item_features, stemming=True):
+    """Returns shared TextProcessor for tuple of item features."""
+    return TextProcessor(item_features, stemming=stemming)
 
-        # stemming
-        if stemming:
-            stems = [nltk.stem.porter.PorterStemmer().stem(w) for w in subtokens]
-            tokens.extend(stems)
-        else:
-            tokens.extend(subtokens)
 
-    processed_text = ' '.join(tokens)
-    return processed_text
+def text_processing(text, item_features, stemming=True):
+    return get_text_processor(tuple(item_features), stemming).process(text)
 
 
 def add_subheader_item_features(df_ret, item_features):
     """Add binary subheader features, 1 if subheader in text and 0 otherwise."""
-    for col in item_features:
-        df_ret[col] = 0
-    for i in range(0, len(df_ret)):
-        text = df_ret.loc[i]['text']
-        items = get_item_subheaders(text, subheaders_only=True)
-        for item in items:
-            df_ret.loc[i,item] = 1
+    flags = build_item_flags(df_ret['text'], item_features)
+    df_ret[item_features] = pd.DataFrame(flags, index=df_ret.index, columns=item_features)
     return df_ret
 
 
-def add_bagofwords_features(df_ret, vectorizer_type, response_variable):
+def add_bagofwords_features(df_ret, vectorizer_type, response_variable, item_features=FEATURES_ITEMS, n_jobs=None):
+    """Returns df_ret and sparse FeatureMatrix of bigram and trigram features of its text, with the index of df_ret."""
     # process text and create bigram, trigram features
-    corpus = []
-    for text in df_ret['text']:
-        corpus.append(text_processing(text))
+    corpus = get_text_processor(tuple(item_features)).process_corpus(df_ret['text'], n_jobs=n_jobs)
     print('vectorizer:', vectorizer_type, '\n')
     if vectorizer_type=='CountVectorizer':
         vectorizer = CountVectorizer(analyzer='word', ngram_range=(2, 3)) # Total Frequency
@@ -160,15 +184,11 @@ def add_bagofwords_features(df_ret, vectorizer_type, response_variable):
         vectorizer = TfidfVectorizer(analyzer='word', ngram_range=(2, 3)) # TF-IDF
     else:
         print('vectorizer_type d.n.e')
-    X_corpus = vectorizer.fit_transform(corpus)
-    df_bagofwords = pd.DataFrame(X_corpus.toarray())
-    df_bagofwords.columns = vectorizer.get_feature_names()
-    
-    # concatenate
-    df_ret = pd.concat([df_ret, df_bagofwords], axis=1)
+    # kept sparse, n-gram features are mostly zeros
+    text_features = FeatureMatrix(vectorizer.fit_transform(corpus), vectorizer.get_feature_names_out(), df_ret.index)
 
     # example features
-    print('letter intent features:', [x for x in df_bagofwords.columns if 'letter intent' in x])
+    print('letter intent features:', [x for x in text_features.columns if 'letter intent' in x])
 
     # histogram
     (n, bins, patches) = plt.hist(df_ret[response_variable], bins=10, label=response_variable)
@@ -177,86 +197,88 @@ def add_bagofwords_features(df_ret, vectorizer_type, response_variable):
     print('bins', np.round(bins,2))
     print('counts', n)
     
-    return df_ret
+    return df_ret, text_features
 
 
-def convert_vote_count_to_int(x):
-    if '—' in x or '-' in x or 'n/a' in x:
-        return 0
-    try:
-        x = int(x.replace(',',''))
-    except:
-        return np.nan
-    return x
+# does not handle: https://www.sec.gov/Archives/edgar/data/1704760/000161577419006723/s117785_8k.htm (no broker non-votes)
+def find_vote_results(text):
+    """Returns (votes for, against, abstain, broker non-votes) in text, None if there are no vote results."""
+    vote_counts = preprocess.find_vote_counts(text)
+    if vote_counts is None:
+        return None
+    return tuple(preprocess.convert_vote_count(count) for count in vote_counts)
 
 
-# does not handle: https://www.sec.gov/Archives/edgar/data/1704760/000161577419006723/s117785_8k.htm (no broker non-votes)
 def parse_vote_results(x):
-    # find strings in text. use first if multiple matches
-    VOTE_HEADER = [
-        'for against abstain broker non-votes',
-        'for against abstain broker non-vote',
-        'for against abstention broker non-votes',
-        'for against abstention broker non-vote',
-        'for against abstentions broker non-votes',
-        'for against abstentions broker non-vote'
-    ]
-    # find phrases preceding vote results in text
-    vote_strings = [vote_string for vote_string in VOTE_HEADER if vote_string in x['text']]
-
-    # parse votes for, votes against, votes abstain, votes broker non votes
-    if len(vote_strings)==0:
+    votes = find_vote_results(x['text'])
+    if votes is None:
         return pd.Series([np.nan, np.nan, np.nan, np.nan])
-    else:
-        vote_string = vote_strings[0] # use first if multiple matches
-        vote_index = x['text'].find(vote_string)
-        vote_data = x['text'][(vote_index + len(vote_string)):].lstrip().split(' ')
-        votes_for = convert_vote_count_to_int(vote_data[0])
-        votes_against = convert_vote_count_to_int(vote_data[1])
-        votes_abstain = convert_vote_count_to_int(vote_data[2])
-        votes_broker_non_votes = convert_vote_count_to_int(vote_data[3])
-        if np.isnan(votes_for) or np.isnan(votes_against) or np.isnan(votes_abstain) or np.isnan(votes_broker_non_votes):
-            print('something wrong with parse_vote_results for', x.symbol, 'on', x.date)
-        return pd.Series([votes_for, votes_against, votes_abstain, votes_broker_non_votes])
-    return pd.Series([np.nan, np.nan, np.nan, np.nan])
+    if np.isnan(votes).any():
+        print('something wrong with parse_vote_results for', x.symbol, 'on', x.date)
+    return pd.Series(list(votes))
 
 
 def parse_redemptions(x):
-    REDEMPTION_HEADER = [
-        'in connection with the extension',
-        'in connection with the closing',
-        'in advance of the special meeting',
-        'in connection with the special meeting',
-        'exercised their right'
-    ]
-    for redemption_phrase in REDEMPTION_HEADER:
-        redemption_sentence = [sentence for sentence in x.text.split('.') if
-                               redemption_phrase in sentence
-                               and ('redeem' in sentence or 'redemp' in sentence)]
-        if len(redemption_sentence)>0:
-            break
-    if len(redemption_sentence)==0:
-        return np.nan
-    redemption_sentence = redemption_sentence[0].lstrip().replace(',','')
-    redemption_sentence = re.sub(r'[\$]{1}[\d,]+\.?\d{0,2}', '', redemption_sentence) # replace $_#_
-    shares_regex_strong = re.findall('[0-9]+ shares', redemption_sentence)
-    shares_regex_weak = re.findall('[0-9]+', redemption_sentence)
-    # case: just one number in sentence. assume this number is redemption number
-    if len(shares_regex_weak)==1:
-        shares = int(shares_regex_weak[0])
-    # case: more than one number in sentence. if '[0-9]+ shares' then assume this is redemption number, otherwise nan
-    elif len(shares_regex_weak)>1:
-        if len(shares_regex_strong)==1:
-            shares = int(shares_regex_strong[0].replace('shares','').replace(' ',''))
-        else:
-            shares = np.nan
-    # case: no numbers in sentence.
-    else:
-        if 'none' in redemption_sentence:
-            shares = 0
-        else:
-            shares = np.nan
-    return shares
+    return preprocess.parse_redemptions(x.text)
+
+
+# self engineered features computed per document, in column order, with their dtypes
+SELF_ENGINEERED_DTYPES = dict(
+    [('keywords_' + category, np.int64) for category in KEYWORDS] +
+    [(col, np.float64) for col in ['votes_for', 'votes_against', 'votes_abstain', 'votes_broker_non_votes',
+                                   'redeemed_shares']] +
+    [('vote_parse_error', np.bool_)])
+# fewer documents than this per process are extracted in the calling process, pool startup costs more than it saves
+MIN_DOCUMENTS_PER_PROCESS = 64
+
+
+def extract_self_engineered_features(text):
+    """Compute all self engineered features of one document in one function, see SELF_ENGINEERED_DTYPES."""
+    counts = KEYWORD_MATCHER.match(text).counts
+    votes = find_vote_results(text)
+    vote_parse_error = votes is not None and bool(np.isnan(votes).any())
+    if votes is None:
+        votes = (np.nan, np.nan, np.nan, np.nan)
+    return tuple([counts[category] for category in KEYWORDS] + list(votes) +
+                 [preprocess.parse_redemptions(text), vote_parse_error])
+
+
+def _extract_self_engineered_features_shard(texts):
+    return [extract_self_engineered_features(text) for text in texts]
+
+
+def _map_shards(func, items, n_jobs=None):
+    """Returns concatenated func(shard) over contiguous shards of items, across a process pool.
+
+    Args:
+        func: picklable function of a list of items, returning a list
+        items: list of items
+        n_jobs: number of processes, None for all cores. capped so each process gets MIN_DOCUMENTS_PER_PROCESS
+    """
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(items) // MIN_DOCUMENTS_PER_PROCESS))
+    if n_jobs == 1:
+        return func(items)
+    # contiguous shards keep order, a few per process to balance long and short documents
+    shard_size = -(-len(items) // (n_jobs * 4))
+    shards = [items[i:i+shard_size] for i in range(0, len(items), shard_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return [result for shard_results in executor.map(func, shards) for result in shard_results]
+
+
+def build_self_engineered_features(texts, n_jobs=None):
+    """Compute self engineered features for many documents, sharded across a process pool.
+
+    Args:
+        texts: iterable of document texts
+        n_jobs: number of processes, None for all cores. capped so each process gets MIN_DOCUMENTS_PER_PROCESS
+    Returns:
+        dataframe with one row per text and columns/dtypes of SELF_ENGINEERED_DTYPES
+    """
+    rows = _map_shards(_extract_self_engineered_features_shard, list(texts), n_jobs)
+    features = pd.DataFrame(rows, columns=list(SELF_ENGINEERED_DTYPES))
+    return features.astype(SELF_ENGINEERED_DTYPES)
 
 
 def compute_self_engineered_feature_metrics(df_ret, col_name, response_variable):
@@ -265,86 +287,22 @@ def compute_self_engineered_feature_metrics(df_ret, col_name, response_variable)
           '; count unique symbols:', len(df_ret[df_ret[col_name]>0]['symbol'].unique()))
 
 
-def add_self_engineered_features(df_ret, response_variable=None):
+def add_self_engineered_features(df_ret, response_variable=None, n_jobs=None):
     """Add self engineered features from keyword lists."""
-    # keywords lists
-    keywords_list_loi = [
-    'entry into a letter of intent',
-    'entry into a non-binding letter of intent',
-    'enter into a letter of intent',
-    'enter into a non-binding letter of intent',
-    'entered into a letter of intent',
-    'entered into a non-binding letter of intent',
-    'entering into a letter of intent',
-    'entering into a non-binding letter of intent',
-    'execution of a letter of intent',
-    'execution of a non-binding letter of intent',
-    'execute a letter of intent',
-    'execute a non-binding letter of intent',
-    'executed a letter of intent',
-    'executed a non-binding letter of intent',
-    'executing a letter of intent',
-    'executing a non-binding letter of intent'
-    ]
-    keywords_list_business_combination_agreement = [
-    '("business combination agreement")',
-    '(the "business combination agreement")',
-    '("business combination")',
-    '(the "business combination")',
-    'entry into a definitive agreement',
-    'enter into a definitive agreement',
-    'entered into a definitive agreement',
-    'entering into a definitive agreement',
-    'business combination proposal was approved'
-    ]
-    keywords_list_merger_agreement = ['(the "merger agreement")']
-    keywords_list_purchase_agreement = ['(the "purchase agreement")']
-    keywords_list_extension = [
-    '(the "extension")',
-    '(the "extension amendment")',
-    'extended the termination date',
-    'extend the date by which the company must consummate',
-    'extend the date by which the company has to complete',
-    '(the "extension amendment proposal")',
-    '(the "extended termination date")'
-    ]
-    keywords_list_meeting = ['("special meeting")', '(the "meeting")']
-    keywords_list_record = ['(the "record date")']
-    keywords_list_consummation = [
-    'announcing the consummation',
-    'consummated the previously announced business combination'
-    ]
-    keywords_list_ipo = [
-    'consummated its initial public offering ("ipo")',
-    'consummated its initial public offering (the "ipo")',
-    'consummated an initial public offering ("ipo")',
-    'consummated an initial public offering (the "ipo")',
-    'consummated the initial public offering ("ipo")',
-    'consummated the initial public offering (the "ipo")',
-    'completed its initial public offering ("ipo")',
-    'completed its initial public offering (the "ipo")',
-    'in connection with its initial public offering ("ipo") was declared effective',
-    'in connection with its initial public offering (the "ipo") was declared effective',
-    'consummated the ipo',
-    'in connection with the closing of the ipo',
-    'closing of the initial public offering (the "ipo")',
-    'consummation of the ipo'
-    ]
-    keywords_list_trust = [
-    'trust account'
-    ]
-    
+    # all features computed in one pass per document, sharded across n_jobs processes
+    features = build_self_engineered_features(df_ret.text, n_jobs=n_jobs)
+    features.index = df_ret.index
+    return _add_self_engineered_columns(df_ret, features, response_variable)
+
+
+def _add_self_engineered_columns(df_ret, features, response_variable=None):
+    """Add self engineered feature columns and ratios from output of build_self_engineered_features."""
+    for i in np.flatnonzero(features['vote_parse_error'].to_numpy()):
+        print('something wrong with parse_vote_results for', df_ret.symbol.iloc[i], 'on', df_ret.date.iloc[i])
+
     # keywords counts
-    df_ret['keywords_loi'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_loi))
-    df_ret['keywords_business_combination_agreement'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_business_combination_agreement))
-    df_ret['keywords_merger_agreement'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_merger_agreement))
-    df_ret['keywords_purchase_agreement'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_purchase_agreement))
-    df_ret['keywords_extension'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_extension))
-    df_ret['keywords_meeting'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_meeting))
-    df_ret['keywords_record'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_record))
-    df_ret['keywords_consummation'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_consummation))
-    df_ret['keywords_ipo'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_ipo))
-    df_ret['keywords_trust'] = df_ret.text.apply(lambda x: count_keywords(x, keywords_list_trust))
+    for category in KEYWORDS:
+        df_ret['keywords_' + category] = features['keywords_' + category]
     
     # compute metrics
     if response_variable is not None:
@@ -355,11 +313,8 @@ def add_self_engineered_features(df_ret, response_variable=None):
             compute_self_engineered_feature_metrics(df_ret, keywords_name, response_variable)
 
     # vote results
-    df_ret['votes_for'] = np.nan
-    df_ret['votes_against'] = np.nan
-    df_ret['votes_abstain'] = np.nan
-    df_ret['votes_broker_non_votes'] = np.nan
-    df_ret[['votes_for', 'votes_against', 'votes_abstain', 'votes_broker_non_votes']] = df_ret.apply(lambda x: parse_vote_results(x), axis=1)
+    vote_columns = ['votes_for', 'votes_against', 'votes_abstain', 'votes_broker_non_votes']
+    df_ret[vote_columns] = features[vote_columns]
     df_ret['vote_total'] = df_ret['votes_for'] + df_ret['votes_against'] + df_ret['votes_abstain'] + df_ret['votes_broker_non_votes']
     df_ret['%votes_for'] = df_ret['votes_for'] / df_ret['vote_total']
     df_ret['%vote_against'] = df_ret['votes_against'] / df_ret['vote_total']
@@ -367,13 +322,54 @@ def add_self_engineered_features(df_ret, response_variable=None):
     df_ret['%votes_broker_non_votes'] = df_ret['votes_broker_non_votes'] / df_ret['vote_total']
     
     # shares redeemed
-    df_ret['redeemed_shares'] = df_ret.apply(lambda x: parse_redemptions(x), axis=1)
+    df_ret['redeemed_shares'] = features['redeemed_shares']
     df_ret['%redeemed'] = df_ret['redeemed_shares'] / df_ret['vote_total']
     
     return df_ret
 
 
-def process_warrant_features(df_returns_warrants, y_variable):
+def compute_text_features(texts, item_features, n_jobs=None):
+    """Returns dataframe of subheader item binary features and self engineered features, one row per text with
+    header and footer removed."""
+    texts = list(texts)
+    features = build_self_engineered_features(texts, n_jobs=n_jobs)
+    flags = pd.DataFrame(build_item_flags(texts, item_features), columns=item_features)
+    return pd.concat([flags, features], axis=1)
+
+
+def add_text_features(df_ret, item_features, response_variable=None, feature_store=None, n_jobs=None,
+                      clean_text=True):
+    """Remove header and footer from text, then add subheader item binary features and self engineered features.
+    With a feature store (spac_feature_store.FeatureStore), only filings not in the store are computed and saved,
+    features of the rest are loaded in bulk. Features are stored per item_features, without the text: header and
+    footer are removed again from texts of stored filings if clean_text, otherwise their text is left as is."""
+    if feature_store is None:
+        texts = [remove_header_footer(text) for text in df_ret.text]
+        features = compute_text_features(texts, item_features, n_jobs=n_jobs)
+        df_ret['text'] = texts
+    else:
+        feature_store = feature_store.variant(parameters_key(item_features))
+        keys = df_ret.text.map(filing_key)
+        stored = feature_store.load(keys.unique())
+        new = ~keys.isin(stored.index) & ~keys.duplicated()
+        cleaned = {key: remove_header_footer(text) for key, text in zip(keys[new], df_ret.text[new])}
+        computed = compute_text_features(cleaned.values(), item_features, n_jobs=n_jobs)
+        computed.index = keys[new]
+        feature_store.save(computed)
+        print('features loaded from store:', len(stored), '; computed:', len(computed))
+        features = pd.concat([frame for frame in (stored, computed) if len(frame) > 0] or [computed]).loc[keys]
+        if clean_text:
+            for key, text in zip(keys, df_ret.text):
+                if key not in cleaned:
+                    cleaned[key] = remove_header_footer(text)
+            df_ret['text'] = keys.map(cleaned)
+    features.index = df_ret.index
+
+    df_ret[item_features] = features[item_features]
+    return _add_self_engineered_columns(df_ret, features, response_variable)
+
+
+def process_warrant_features(df_returns_warrants, y_variable, feature_store=None):
     # get all warrants and drop nan and corrupt symbols
     df_returns_warrants.drop(columns=['letter_of_intent_found','business_combination_agreement_found','form','open_completion_%chg'], inplace=True)
     df_returns_warrants.dropna(inplace=True)
@@ -381,53 +377,68 @@ def process_warrant_features(df_returns_warrants, y_variable):
     df_returns_warrants.sort_values(by='accepted_time', inplace=True) # need to sort for TimeSeriesSplit
     df_returns_warrants.reset_index(inplace=True, drop=True)
 
-    # remove header and footer
-    df_returns_warrants['text'] = df_returns_warrants.text.apply(lambda x: remove_header_footer(x))
-
-    # add subheader item binary features
-    df_returns_warrants = add_subheader_item_features(df_ret=df_returns_warrants, item_features=FEATURES_ITEMS)
+    # remove header and footer, add subheader item binary features and self engineered features
+    df_returns_warrants = add_text_features(df_ret=df_returns_warrants, item_features=FEATURES_ITEMS,
+                                            response_variable=y_variable, feature_store=feature_store)
 
     # add bag of words features
-    # df_returns_warrants = add_bagofwords_features(df_ret=df_returns_warrants,
-    #                                               vectorizer_type='CountVectorizer', # CountVectorizer or TfidfVectorizer
-    #                                               response_variable=y_variable)
-
-    # add self engineered features
-    df_returns_warrants = add_self_engineered_features(df_ret=df_returns_warrants, response_variable=y_variable)
+    # df_returns_warrants, text_features = add_bagofwords_features(df_ret=df_returns_warrants,
+    #                                                              vectorizer_type='CountVectorizer', # CountVectorizer or TfidfVectorizer
+    #                                                              response_variable=y_variable)
+    # then pass text_features to split_warrant_train_test
 
     return df_returns_warrants
 
 
 def apply_lsa_dim_reduction(X, n_lsa):
     lsa = TruncatedSVD(n_components=n_lsa, n_iter=10, random_state=123)
-    X = pd.DataFrame(lsa.fit_transform(X), columns=['lsa'+str(i) for i in range(0,n_lsa)])
+    columns = ['lsa'+str(i) for i in range(0,n_lsa)]
+    if isinstance(X, FeatureMatrix):
+        # truncated svd works on the sparse matrix directly
+        X = FeatureMatrix(lsa.fit_transform(X.matrix), columns, X.index)
+    else:
+        X = pd.DataFrame(lsa.fit_transform(X), columns=columns)
     print('count feature after LSA:', len(X.columns), '\n')
     return X
 
 
-def split_warrant_train_test(df_returns_warrants, y_variable):
+def build_warrant_feature_matrix(df_returns_warrants, text_features=None):
+    """Returns FeatureMatrix of engineered features of df_returns_warrants, with text_features appended if given."""
+    cols_drop = ['symbol','date','accepted_time','text','url','votes_for','votes_against',
+                 'votes_abstain','votes_broker_non_votes','vote_total','%votes_for',
+                 '%votes_abstain','%votes_broker_non_votes','redeemed_shares']
+    cols_drop.extend([col for col in df_returns_warrants.columns if '%chg' in col])
+    X_engineered = df_returns_warrants.drop(cols_drop, axis=1)
+    X_engineered[['%vote_against','%redeemed']] = X_engineered[['%vote_against','%redeemed']].fillna(0)
+    X = FeatureMatrix.from_frame(X_engineered)
+    if text_features is not None:
+        X = X.hstack(text_features)
+    return X
+
+
+def split_warrant_train_test(df_returns_warrants, y_variable, text_features=None):
+    """Returns X, X_train, X_test as FeatureMatrix objects (sparse), with engineered features of
+    df_returns_warrants and text_features (FeatureMatrix from add_bagofwords_features) if given, and labels."""
     # inputs
     label_threshold = 0
     min_word_freq = 0
     n_lsa = None # None or int
 
     # split
-    cols_drop = ['symbol','date','accepted_time','text','url','votes_for','votes_against',
-                 'votes_abstain','votes_broker_non_votes','vote_total','%votes_for',
-                 '%votes_abstain','%votes_broker_non_votes','redeemed_shares']
-    cols_drop.extend([col for col in df_returns_warrants.columns if '%chg' in col])
-    X = df_returns_warrants.drop(cols_drop, axis=1)
-    X[['%vote_against','%redeemed']] = X[['%vote_against','%redeemed']].fillna(0)
-    X = X[X.columns[X.sum() >= min_word_freq].tolist()] # min word frequency
+    X = build_warrant_feature_matrix(df_returns_warrants, text_features)
+    X = X.select_columns(X.column_sums() >= min_word_freq) # min word frequency
     if n_lsa is not None:
         X = apply_lsa_dim_reduction(X, n_lsa) # lsa dimension reduction
     y = np.where(df_returns_warrants[y_variable] > label_threshold, 1, 0) # label threshold
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=123)
+    # split row positions, so the feature matrix stays sparse
+    rows_train, rows_test, y_train, y_test = train_test_split(np.arange(len(X)), y, test_size=0.2, random_state=123)
+    X_train, X_test = X.take(rows_train), X.take(rows_test)
 
     return X, X_train, X_test, y, y_train, y_test
 
 
 def binary_classification_report(model, X, y_actual, y_pred):
+    X = model_input(X)
     cm = confusion_matrix(y_actual, y_pred)
     cr = classification_report(y_actual, y_pred, target_names=['0','1'], output_dict=True, digits=2)
     cr = pd.DataFrame.from_dict({key: cr[key] for key in ['0','1']}, orient='index')
@@ -461,30 +472,105 @@ def plot_feature_importance(model, X):
     return fig
 
 
-def logistic_reg_train(X_train, y_train):
-    model_lr = LogisticRegression(penalty='l1', solver='liblinear', max_iter=1000)
-    C = [.01, .1, 1, 10, 100, 1000]
-    param_grid = dict(C=C)
-    kfold = TimeSeriesSplit(n_splits=5) # in each split test indices must be higher than before
-    grid_search = GridSearchCV(model_lr, param_grid, scoring='precision', cv=kfold, verbose=0, n_jobs=5)
-    grid_result = grid_search.fit(X_train, y_train)
-    reg_path = pd.DataFrame({'score': grid_result.cv_results_['mean_test_score'], 'C': C})
+class RegularizationPath(object):
+
+    def __init__(self, param_name, values, scores, models):
+        """Cross validated scores of a regularization path, with the attributes of a fitted GridSearchCV used here.
+
+        Args:
+            param_name: name of regularization parameter, e.g. 'C'
+            values: parameter values along the path
+            scores: array of test scores, one row per fold and one column per value
+            models: models fit on each fold, one list per fold and one model per value
+
+        best_estimator_ is the last fold's model at the best value, reused instead of refitting. With TimeSeriesSplit
+        the last fold trains on the most and the latest filings, like a refit on all but the last test window.
+        """
+        mean_scores = np.nanmean(scores, axis=0)
+        best = int(np.nanargmax(mean_scores))
+        self.cv_results_ = {'params': [{param_name: value} for value in values],
+                            'mean_test_score': mean_scores, 'std_test_score': np.nanstd(scores, axis=0)}
+        self.scores_ = scores
+        self.best_index_ = best
+        self.best_params_ = {param_name: values[best]}
+        self.best_score_ = mean_scores[best]
+        self.best_estimator_ = models[-1][best]
+
+
+def _fit_score(model, X, y, train, test, scorer):
+    """Returns model fit on train rows and its score on test rows."""
+    model.fit(X[train], y[train])
+    return model, scorer(model, X[test], y[test])
+
+
+def fit_regularization_path(model, param_name, values, X, y, scoring, cv, n_jobs=None):
+    """Fit model along a path of regularization values on each fold, warm starting each fit from the previous one.
+
+    Models without warm_start fit every value from scratch, so all folds and values are fit in parallel instead.
+    Args:
+        model: estimator, fit with warm_start=True if it has that parameter (ignored by some solvers, e.g. liblinear)
+        param_name: name of regularization parameter
+        values: parameter values, from strongest to weakest regularization
+        X: model input matrix
+        y: labels
+        scoring: scoring name, e.g. 'f1'
+        cv: cross validation splitter
+        n_jobs: number of processes fitting models without warm_start, -1 for all cores
+    Returns:
+        RegularizationPath object
+    """
+    scorer = get_scorer(scoring)
+    folds = list(cv.split(X))
+    scores, models = np.full((len(folds), len(values)), np.nan), []
+    if 'warm_start' not in model.get_params():
+        fits = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(_fit_score)(clone(model).set_params(**{param_name: value}), X, y, train, test, scorer)
+            for train, test in folds for value in values)
+        for fold in range(len(folds)):
+            fold_fits = fits[fold * len(values):(fold + 1) * len(values)]
+            models.append([fold_model for fold_model, _ in fold_fits])
+            scores[fold] = [score for _, score in fold_fits]
+        return RegularizationPath(param_name, values, scores, models)
+    model = copy.deepcopy(model).set_params(warm_start=True)
+    for fold, (train, test) in enumerate(folds):
+        fold_model, fold_models = copy.deepcopy(model), []
+        for i, value in enumerate(values):
+            fold_model.set_params(**{param_name: value}).fit(X[train], y[train])
+            scores[fold, i] = scorer(fold_model, X[test], y[test])
+            fold_models.append(copy.deepcopy(fold_model))
+        models.append(fold_models)
+    return RegularizationPath(param_name, values, scores, models)
+
+
+def plot_regularization_path(path_result, C):
+    reg_path = pd.DataFrame({'score': path_result.cv_results_['mean_test_score'], 'C': C})
     reg_path['C'] = np.log10(reg_path['C'])
     fig = plt.figure()
     ax = fig.add_subplot(1,1,1)
     reg_path.plot(x='C', ax=ax)
     ax.xaxis.set_label_text('log10(C)')
-    model = LogisticRegression(penalty='l1', solver='liblinear', C=grid_result.best_params_['C'], max_iter=1000)
-    model.fit(X_train, y_train)
-    return grid_result, fig, model
+    return fig
+
+
+def logistic_reg_train(X_train, y_train):
+    # liblinear ignores warm_start, each C is fit from scratch. saga would warm start, but converges slowly on
+    # unscaled count features and changes the selected coefficients
+    X_train = model_input(X_train)
+    model_lr = LogisticRegression(penalty='l1', solver='liblinear', max_iter=1000)
+    C = [.01, .1, 1, 10, 100, 1000]
+    kfold = TimeSeriesSplit(n_splits=5) # in each split test indices must be higher than before
+    path_result = fit_regularization_path(model_lr, 'C', C, X_train, y_train, scoring='precision', cv=kfold)
+    fig = plot_regularization_path(path_result, C)
+    return path_result, fig, path_result.best_estimator_
 
 
 def decision_tree_train(X_train, y_train):
+    X_train = model_input(X_train)
     model_dt = DecisionTreeClassifier()
     max_depth = list(range(1, 20))
     param_grid = dict(max_depth=max_depth)
     kfold = TimeSeriesSplit(n_splits=5) # in each split test indices must be higher than before
-    grid_search = GridSearchCV(model_dt, param_grid, scoring='f1', cv=kfold, verbose=0, n_jobs=5)
+    grid_search = GridSearchCV(model_dt, param_grid, scoring='f1', cv=kfold, verbose=0, n_jobs=-1)
     grid_result = grid_search.fit(X_train, y_train)
     reg_path = pd.DataFrame({'score': grid_result.cv_results_['mean_test_score'], 'max_depth': max_depth})
     fig = plt.figure()
@@ -496,6 +582,7 @@ def decision_tree_train(X_train, y_train):
 
 
 def random_forest_train(X_train, y_train):
+    X_train = model_input(X_train)
     model_rf = RandomForestClassifier()
     n_estimators = list(range(1, 10))
     max_depth = list(range(1, 10))
@@ -503,7 +590,7 @@ def random_forest_train(X_train, y_train):
     param_grid = dict(n_estimators=n_estimators,max_depth=max_depth,
                       min_samples_leaf=min_samples_leaf)
     kfold = TimeSeriesSplit(n_splits=5) # in each split test indices must be higher than before
-    grid_search = GridSearchCV(model_rf, param_grid, scoring='f1', cv=kfold, verbose=0, n_jobs=5)
+    grid_search = GridSearchCV(model_rf, param_grid, scoring='f1', cv=kfold, verbose=0, n_jobs=-1)
     grid_result = grid_search.fit(X_train, y_train)
     model = RandomForestClassifier(n_estimators=grid_result.best_params_['n_estimators'],
                                    max_depth=grid_result.best_params_['max_depth'],
@@ -513,27 +600,86 @@ def random_forest_train(X_train, y_train):
 
 
 def svm_train(X_train, y_train):
-    kernel_type = 'linear'
-    model_svm = SVC(kernel=kernel_type)
+    # SVC does not warm start, the fits of all folds and values of C run in parallel
+    X_train = model_input(X_train)
+    model_svm = SVC(kernel='linear')
     C = [.01, .1, 1, 10, 100, 1000, 10000]
-    param_grid = dict(C=C)
     kfold = TimeSeriesSplit(n_splits=5) # in each split test indices must be higher than before
-    grid_search = GridSearchCV(model_svm, param_grid, scoring='f1', cv=kfold, verbose=0, n_jobs=5)
-    grid_result = grid_search.fit(X_train, y_train)
-    reg_path = pd.DataFrame({'score': grid_result.cv_results_['mean_test_score'], 'C': C})
-    reg_path['C'] = np.log10(reg_path['C'])
-    fig = plt.figure()
-    ax = fig.add_subplot(1,1,1)
-    reg_path.plot(x='C', ax=ax)
-    ax.xaxis.set_label_text('log10(C)')
-    model = SVC(kernel=kernel_type, C=grid_result.best_params_['C'])
-    model.fit(X_train, y_train)
-    return grid_result, fig, model
-
-
-def trading_metrics(df_returns_warrants, y_variable, y_all_pred):
-    count_months = int(np.round((dt.strptime(df_returns_warrants.date.max(),'%Y-%m-%d') -
-                                 dt.strptime(df_returns_warrants.date.min(),'%Y-%m-%d')).days / 365. * 12, 0))
+    path_result = fit_regularization_path(model_svm, 'C', C, X_train, y_train, scoring='f1', cv=kfold, n_jobs=-1)
+    fig = plot_regularization_path(path_result, C)
+    return path_result, fig, path_result.best_estimator_
+
+
+# model families compared by select_models, name -> (estimator, parameter grid). grids as in the trainers above
+MODEL_FAMILIES = {
+    'Logistic Regression': (LogisticRegression(penalty='l1', solver='liblinear', max_iter=1000),
+                            dict(C=[.01, .1, 1, 10, 100, 1000])),
+    'Decision Tree': (DecisionTreeClassifier(), dict(max_depth=list(range(1, 20)))),
+    'Support Vector Machine': (SVC(kernel='linear'), dict(C=[.01, .1, 1, 10, 100, 1000, 10000])),
+    'Random Forest': (RandomForestClassifier(), dict(n_estimators=list(range(1, 10)), max_depth=list(range(1, 10)),
+                                                     min_samples_leaf=[.01, .05, .1, .2])),
+}
+# grids with at least this many configs are searched by successive halving, with the first of these parameters in
+# the grid as budget: all configs are scored with its smallest value, the best third continue with three times as much
+HALVING_MIN_CANDIDATES = 50
+HALVING_RESOURCES = ['n_estimators']
+
+
+def select_models(X_train, y_train, families=None, scoring='f1', n_splits=5, n_jobs=-1):
+    """Search parameter grids of all model families in one job and rank all configs in a single table.
+
+    Fold splits (TimeSeriesSplit) and the model input matrix are computed once and shared by all searches, which
+    run on one process pool of n_jobs workers (-1 for all cores). Large grids are searched by successive halving,
+    see HALVING_MIN_CANDIDATES.
+    Args:
+        X_train: FeatureMatrix or dataframe
+        y_train: binary labels
+        families: dict like MODEL_FAMILIES, defaults to MODEL_FAMILIES
+        scoring: scoring of all searches, so scores are comparable across families
+        n_splits: number of TimeSeriesSplit folds
+        n_jobs: number of processes in pool
+    Returns:
+        ranking: dataframe with one row per config, columns model, params, mean_test_score, std_test_score and
+            rank. configs dropped by successive halving are last, scored with their last budget and rank nan
+        searches: dict of model family name to fitted search, with best_estimator_ refit on all of X_train
+    """
+    X_train = model_input(X_train)
+    families = MODEL_FAMILIES if families is None else families
+    folds = list(TimeSeriesSplit(n_splits=n_splits).split(X_train)) # in each split test indices must be higher than before
+    searches, results = {}, []
+    with joblib.parallel_backend('loky', n_jobs=n_jobs):
+        for name, (estimator, param_grid) in families.items():
+            n_candidates = int(np.prod([len(values) for values in param_grid.values()]))
+            resources = [resource for resource in HALVING_RESOURCES if resource in param_grid]
+            if n_candidates >= HALVING_MIN_CANDIDATES and resources:
+                resource = resources[0]
+                search = HalvingGridSearchCV(estimator, {k: v for k, v in param_grid.items() if k != resource},
+                                             scoring=scoring, cv=folds, factor=3, resource=resource,
+                                             min_resources=min(param_grid[resource]),
+                                             max_resources=max(param_grid[resource]), random_state=123)
+            else:
+                search = GridSearchCV(estimator, param_grid, scoring=scoring, cv=folds)
+            searches[name] = search.fit(X_train, y_train)
+            cv_results = pd.DataFrame(search.cv_results_)
+            cv_results['fully_evaluated'] = True
+            if isinstance(search, HalvingGridSearchCV):
+                # keep each config's last iteration, configs of the last iteration are the ones not dropped
+                cv_results['fully_evaluated'] = cv_results.iter == cv_results.iter.max()
+                cv_results = cv_results.drop_duplicates(['param_' + k for k in param_grid if k != resource],
+                                                        keep='last')
+            cv_results['model'] = name
+            results.append(cv_results[['model', 'params', 'mean_test_score', 'std_test_score', 'fully_evaluated']])
+    ranking = pd.concat(results, ignore_index=True)
+    ranking = ranking.sort_values(['fully_evaluated', 'mean_test_score'], ascending=False, na_position='last',
+                                  kind='stable').reset_index(drop=True)
+    ranking['rank'] = np.where(ranking.fully_evaluated, np.arange(1, len(ranking) + 1), np.nan)
+    return ranking.drop(columns=['fully_evaluated']), searches
+
+
+def trading_metrics(df_returns_warrants, y_variable, y_all_pred, count_months=None):
+    if count_months is None:
+        count_months = int(np.round((dt.strptime(df_returns_warrants.date.max(),'%Y-%m-%d') -
+                                     dt.strptime(df_returns_warrants.date.min(),'%Y-%m-%d')).days / 365. * 12, 0))
     trades_per_month = y_all_pred.sum()/count_months
     df_pred_pos = df_returns_warrants.loc[np.where(y_all_pred==1)[0],]
     sum_returns = df_pred_pos[y_variable].sum()
@@ -544,3 +690,55 @@ def trading_metrics(df_returns_warrants, y_variable, y_all_pred):
     sortino_ratio = mean_return / sd_return_dn
     return trades_per_month, sum_returns, mean_return, sd_return, sd_return_dn, sharpe_ratio, sortino_ratio
 
+
+WALK_FORWARD_COLUMNS = ['month', 'count_train', 'count_test', 'trades_per_month', 'sum_returns', 'mean_return',
+                        'sd_return', 'sd_return_dn', 'sharpe_ratio', 'sortino_ratio']
+
+
+def walk_forward(df_returns_warrants, y_variable, model=None, min_train_months=1, text_features=None):
+    """Walk forward through accepted_time in monthly windows, updating one model incrementally.
+
+    Each month's filings are first predicted out of sample by the model trained on all earlier months, then the
+    model is updated with partial_fit on that month's filings only, instead of refitting on the full history.
+    The feature matrix is built once, windows are row slices of it.
+    Args:
+        df_returns_warrants: dataframe from process_warrant_features, sorted by accepted_time
+        y_variable: return column, label is 1 if return > 0
+        model: estimator with partial_fit, defaults to linear svm fit by averaged sgd. an unfitted clone is trained,
+            model itself is left as is
+        min_train_months: number of months only trained on before the first prediction, at least 1
+        text_features: FeatureMatrix from add_bagofwords_features, optional
+    Returns:
+        df_windows: dataframe with one row per predicted month and WALK_FORWARD_COLUMNS, trading metrics of the
+            month's predictions
+        y_pred: out of sample prediction per filing, nan for filings of the first min_train_months months
+    """
+    label_threshold = 0
+    if model is None:
+        model = SGDClassifier(loss='hinge', average=True, random_state=123)
+    if not hasattr(model, 'partial_fit'):
+        raise ValueError('walk forward needs a model with partial_fit, got %s' % type(model).__name__)
+    if min_train_months < 1:
+        raise ValueError('walk forward needs min_train_months >= 1 to train before predicting, got %s'
+                         % min_train_months)
+    model = clone(model)
+    X = model_input(build_warrant_feature_matrix(df_returns_warrants, text_features))
+    y = np.where(df_returns_warrants[y_variable] > label_threshold, 1, 0) # label threshold
+    months = pd.to_datetime(df_returns_warrants.accepted_time).dt.to_period('M')
+    windows = pd.Series(np.arange(len(months))).groupby(months.to_numpy(), sort=True).indices
+
+    y_pred = np.full(len(y), np.nan)
+    results, count_train = [], 0
+    for i, month in enumerate(sorted(windows)):
+        rows_window = windows[month]
+        if i >= min_train_months:
+            y_pred_window = model.predict(X[rows_window])
+            y_pred[rows_window] = y_pred_window
+            df_window = df_returns_warrants.iloc[rows_window].reset_index(drop=True)
+            # a window is one month, however few days its filings span
+            results.append((str(month), count_train, len(rows_window)) +
+                           trading_metrics(df_window, y_variable, y_pred_window, count_months=1))
+        # learn from the month once its filings are scored
+        model.partial_fit(X[rows_window], y[rows_window], classes=[0, 1])
+        count_train += len(rows_window)
+    return pd.DataFrame(results, columns=WALK_FORWARD_COLUMNS), y_pred
@@ -0,0 +1,155 @@
+"""
+    Description:
+        Registry of trained models saved to disk with their feature schema, versioned, for scoring in the live pipeline
+"""
+
+
+import json
+import os
+import tempfile
+import time
+import joblib
+import numpy as np
+from spac_feature_matrix import FeatureMatrix, model_input
+from spac_feature_store import FEATURE_VERSION
+
+
+DEFAULT_MODEL_REGISTRY_DIR = 'data/model_registry'
+# name of the model scoring new 8-Ks in the live pipeline
+LIVE_MODEL_NAME = 'warrant_classifier'
+# missing values filled as in split_warrant_train_test
+DEFAULT_FILL_VALUES = {'%vote_against': 0, '%redeemed': 0}
+
+
+class RegisteredModel(object):
+
+    def __init__(self, name, version, model, columns, fill_values, metadata, load_seconds=None):
+        """Initialize trained model with the feature schema it was trained on.
+
+        Args:
+            name: registered model name
+            version: integer version of model under name
+            model: fitted sklearn estimator
+            columns: feature names, in the column order the model was trained on
+            fill_values: dict of column name to value filled in for missing values before scoring
+            metadata: dict of anything else saved with the model, e.g. cv score
+            load_seconds: time it took to load model from registry
+        """
+        self.name = name
+        self.version = version
+        self.model = model
+        self.columns = list(columns)
+        self.fill_values = dict(fill_values)
+        self.metadata = dict(metadata)
+        self.load_seconds = load_seconds
+        self.last_predict_seconds = None
+
+    def feature_matrix(self, df_features):
+        """Returns FeatureMatrix of dataframe columns in schema order. Raises ValueError if columns are missing."""
+        missing = [col for col in self.columns if col not in df_features.columns]
+        if missing:
+            raise ValueError('features missing for model %s v%d: %s' % (self.name, self.version, missing))
+        return FeatureMatrix.from_frame(df_features[self.columns].fillna(self.fill_values))
+
+    def predict(self, df_features):
+        """Returns labels of all rows of df_features in one predict call, and records its latency."""
+        start_time = time.perf_counter()
+        X = self.feature_matrix(df_features)
+        y_pred = self.model.predict(model_input(X)) if len(X) > 0 else np.zeros(0, dtype=int)
+        self.last_predict_seconds = time.perf_counter() - start_time
+        print('model %s v%d scored %d filings in %.1f ms'
+              % (self.name, self.version, len(X), self.last_predict_seconds * 1000))
+        return y_pred
+
+
+class ModelRegistry(object):
+
+    def __init__(self, directory=DEFAULT_MODEL_REGISTRY_DIR):
+        """Initialize registry of trained models on disk.
+
+        Each version of a model is a joblib file holding the model and its feature schema, next to a JSON file with
+        its metadata. Versions count up from 1 per model name. Models record the feature code version
+        (spac_feature_store.FEATURE_VERSION) they were trained with, and are not loaded under another one.
+        Args:
+            directory: path of registry directory
+        """
+        self.directory = directory
+
+    def _paths(self, name, version):
+        base = os.path.join(self.directory, name, 'v%d' % version)
+        return base + '.joblib', base + '.json'
+
+    def _write(self, path, write):
+        """Write file atomically through a temporary file."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def versions(self, name):
+        """Returns sorted list of saved versions of model name."""
+        directory = os.path.join(self.directory, name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(file[1:-len('.joblib')]) for file in os.listdir(directory)
+                      if file.startswith('v') and file.endswith('.joblib'))
+
+    def save(self, name, model, columns, fill_values=None, metadata=None):
+        """Save trained model and its feature schema as the next version of name.
+
+        Args:
+            name: model name, e.g. LIVE_MODEL_NAME
+            model: fitted sklearn estimator
+            columns: feature names in training column order, e.g. FeatureMatrix.columns
+            fill_values: dict of column name to value filled in for missing values, defaults to DEFAULT_FILL_VALUES
+            metadata: dict of JSON serializable values saved with the model
+        Returns:
+            integer version saved
+        """
+        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        versions = self.versions(name)
+        version = versions[-1] + 1 if versions else 1
+        model_path, meta_path = self._paths(name, version)
+        meta = {'name': name, 'version': version, 'feature_version': FEATURE_VERSION, 'saved_at': time.time(),
+                'model_type': type(model).__name__, 'metadata': metadata or {}}
+        artifact = {'model': model, 'columns': [str(col) for col in columns],
+                    'fill_values': DEFAULT_FILL_VALUES if fill_values is None else fill_values}
+
+        def write_meta(path):
+            with open(path, 'w') as f:
+                json.dump(meta, f)
+        self._write(meta_path, write_meta)
+        self._write(model_path, lambda path: joblib.dump(artifact, path))
+        return version
+
+    def load(self, name, version=None):
+        """Load model name, the latest version if version is None.
+
+        Returns:
+            RegisteredModel object
+        Raises:
+            FileNotFoundError if no such model is saved
+            ValueError if it was trained with another feature code version
+        """
+        start_time = time.perf_counter()
+        if version is None:
+            versions = self.versions(name)
+            if not versions:
+                raise FileNotFoundError('model %s not found in %s' % (name, self.directory))
+            version = versions[-1]
+        model_path, meta_path = self._paths(name, version)
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta['feature_version'] != FEATURE_VERSION:
+            raise ValueError('model %s v%d was trained with feature version %d, current is %d'
+                             % (name, version, meta['feature_version'], FEATURE_VERSION))
+        artifact = joblib.load(model_path)
+        load_seconds = time.perf_counter() - start_time
+        print('loaded model %s v%d (%s) in %.1f ms' % (name, version, meta['model_type'], load_seconds * 1000))
+        return RegisteredModel(name, version, artifact['model'], artifact['columns'], artifact['fill_values'],
+                               meta['metadata'], load_seconds=load_seconds)
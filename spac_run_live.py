@@ -4,17 +4,27 @@
 """
 
 
+from classification.rules import WARRANT_RULES
 from datetime import datetime as dt, timedelta
 import numpy as np
 import pandas as pd
-from spac_web_processing import get_current_spacs, process_current_spacs, get_forms_text, basic_text_match
-from spac_machine_learning import FEATURES_ITEMS, remove_header_footer, add_subheader_item_features, add_self_engineered_features
-import time
+from spac_web_processing import get_current_spacs, process_current_spacs, filings_to_df, basic_text_match
+from spac_machine_learning import FEATURES_ITEMS, add_text_features
+import sec_scraper
 
 
-def agg_form_8K(spac_list, write=False):
+def agg_form_8K(spac_list, write=False, max_workers=10, sync_state=None):
     """Returns dataframe of 8-Ks for all symbols. Columns: date, accepted_time, symbol, 
-    form, text, letter_of_intent_found, business_combination_agreement_found."""
+    form, text, letter_of_intent_found, business_combination_agreement_found.
+    If sync_state (sec_scraper.SyncState) is passed, only 8-Ks not seen in a previous run are returned."""
+    # fetch 8-Ks for all symbols in parallel. edgar allows no more than 10 requests per second,
+    # which is enforced by the rate limiter shared by all sec_scraper requests
+    cache = sec_scraper.get_document_cache()
+    companies = [sec_scraper.Company(row.title, row.cik, timeout=20, cache=cache) for row in spac_list.itertuples()]
+    all_filings = sec_scraper.get_all_filings_concurrent(companies, filing_type='8-K', no_of_documents=2,
+                                                         max_workers=max_workers, sync_state=sync_state)
+    print('http connection stats:', sec_scraper.get_session().stats())
+
     df_form_8K_agg = pd.DataFrame()
     count_missing_8K = 0
     for ind in range(0, len(spac_list)):
@@ -23,8 +33,11 @@ def agg_form_8K(spac_list, write=False):
         print(row.ticker)
 
         # get form 8Ks
-        df_form_8K = get_forms_text(company_name=row.title, cik_id=row.cik, form_type='8-K')
-        time.sleep(.2) # edgar allows no more than 10 requests per second
+        filings = all_filings[ind]
+        if sync_state is not None and filings is not None and len(filings)==0:
+            print('no new 8Ks since last sync, skipping...\n')
+            continue
+        df_form_8K = None if filings is None else filings_to_df(filings)
         if df_form_8K is None or len(df_form_8K)==0:
             print('no 8Ks found (or timed out), skipping...\n')
             count_missing_8K = count_missing_8K + 1
@@ -42,6 +55,8 @@ def agg_form_8K(spac_list, write=False):
         df_form_8K_agg = df_form_8K_agg.append(df_form_8K)
 
     print('\ncount symbols missing 8-Ks:', count_missing_8K)
+    if len(df_form_8K_agg)==0:
+        return pd.DataFrame(columns=['date','text','accepted_time','symbol'])
         
     # drop duplicates on date + symbol
     # todo: if date has multipled 8-Ks, concatenate text instead of dropping
@@ -59,56 +74,78 @@ def agg_form_8K(spac_list, write=False):
     return df_form_8K_agg
 
 
-def classifier(x):
-    """Rule based model to classify 8-K as 1 (buy warrant) or 0 (do nothing)."""
-    if ~np.isnan(x['%vote_against']) and (x['%vote_against'] > .10):
-        return 0
-    elif x['keywords_ipo'] > 0:
-        return 0
-    else:
-        if (x['keywords_loi'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_business_combination_agreement'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_consummation'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_extension'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        elif (x['keywords_trust'] > 0) and (x['item 2.03'] == 0):
-            return 1
-        else:
-            return 0
+def agg_form_8K_from_index(spac_list, start_date, end_date, index_dir=None, offline=False, max_workers=10):
+    """Returns dataframe of 8-Ks filed between start_date and end_date for all symbols. Columns: date, text,
+    accepted_time, symbol. 8-Ks are discovered from edgar daily index files (one request per day for all
+    symbols) instead of each company's filings page. Daily indexes are published after the end of each
+    business day. If index_dir is passed, index files are read from/saved to it, and offline=True only uses it."""
+    spac_list = spac_list.dropna(subset=['cik'])
+    cik_to_ticker = dict(zip(spac_list.cik.map(sec_scraper.cik_key), spac_list.ticker))
+    entries = list(sec_scraper.iter_daily_index(start_date, end_date, form_types=['8-K'], ciks=cik_to_ticker.keys(),
+                                                local_dir=index_dir, offline=offline))
+    print('count 8-Ks found in daily indexes:', len(entries))
+    filings = sec_scraper.get_index_filings(entries, timeout=20, cache=sec_scraper.get_document_cache(),
+                                            max_workers=max_workers)
+
+    df_form_8K_agg = pd.DataFrame(columns=['date','text','accepted_time','symbol'])
+    for entry, filing in zip(entries, filings):
+        if filing is None:
+            print('could not download', entry.filing_url)
+            continue
+        df_form_8K = filings_to_df([filing]).drop(columns=['form'])
+        df_form_8K['symbol'] = cik_to_ticker[sec_scraper.cik_key(entry.cik)]
+        df_form_8K_agg = pd.concat([df_form_8K_agg, df_form_8K])
+    df_form_8K_agg = df_form_8K_agg.drop_duplicates(subset=['date','symbol'])
+    df_form_8K_agg.sort_values(by='accepted_time', inplace=True)
+    df_form_8K_agg.reset_index(inplace=True, drop=True)
+    return df_form_8K_agg
 
 
-def run_live_model(spac_list_current):
+def run_live_model(spac_list_current, sync_state=None, use_daily_index=False, index_dir=None, feature_store=None,
+                   model=None):
+    """Returns dataframes of new 8-Ks and of warrants to buy. If sync_state (sec_scraper.SyncState) is passed,
+    only 8-Ks not seen in a previous run are scraped and classified, and the high-water marks are saved once they are.
+    If use_daily_index, 8-Ks are discovered from edgar daily index files, see agg_form_8K_from_index.
+    If feature_store (spac_feature_store.FeatureStore) is passed, features of 8-Ks seen before are loaded from it.
+    If model (spac_model_registry.RegisteredModel) is passed, 8-Ks are scored by it in one predict call instead of
+    by the rule based classifier."""
     # process current spac list
     spac_list_current = process_current_spacs(spac_list=spac_list_current)
 
     # get returns following 8-Ks for current spacs
-    df_form_8K_agg = agg_form_8K(spac_list=spac_list_current, write=False)
+    min_date = (dt.today()-timedelta(days=2)).strftime('%Y-%m-%d')
+    if use_daily_index:
+        df_form_8K_agg = agg_form_8K_from_index(spac_list=spac_list_current,
+                                                start_date=dt.strptime(min_date, '%Y-%m-%d').date(),
+                                                end_date=dt.today().date(), index_dir=index_dir)
+    else:
+        df_form_8K_agg = agg_form_8K(spac_list=spac_list_current, write=False, sync_state=sync_state)
 
     # get 8-Ks added yesterday or today
-    min_date = (dt.today()-timedelta(days=2)).strftime('%Y-%m-%d')
     df_new_8Ks = df_form_8K_agg[df_form_8K_agg.date>=min_date][['symbol','accepted_time']].reset_index(drop=True)
     df_new_8Ks.rename(columns={'accepted_time':'filing_time'}, inplace=True)
+    if len(df_form_8K_agg)==0:
+        if sync_state is not None:
+            sync_state.save()
+        return df_new_8Ks, pd.DataFrame(columns=['symbol','filing_time','keywords_loi','keywords_bca',
+                                                 'keywords_consummation','keywords_extension','keywords_trust',
+                                                 'item 2.03','%vote_against',r'%redeemed'])
 
     # features dataframe
     df_features = df_form_8K_agg.copy()
 
-    # remove header and footer
-    df_features['text'] = df_features.text.apply(lambda x: remove_header_footer(x))
-
-    # add subheader item binary features
-    df_features = add_subheader_item_features(df_ret=df_features, item_features=FEATURES_ITEMS)
-
-    # add self engineered features
-    df_features = add_self_engineered_features(df_ret=df_features)
+    # remove header and footer, add subheader item binary features and self engineered features
+    df_features = add_text_features(df_ret=df_features, item_features=FEATURES_ITEMS, feature_store=feature_store,
+                                    clean_text=False) # text is dropped before prediction
 
     # drop unused features for prediction step
     df_features = df_features.drop(['symbol','date','accepted_time','text'], axis=1)
 
     # prediction step
-    y_pred = df_features.apply(lambda x: classifier(x), axis=1)
+    if model is None:
+        y_pred = WARRANT_RULES.predict(df_features)
+    else:
+        y_pred = model.predict(df_features)
 
     # positive label predictions
     df_pred_pos = df_form_8K_agg.loc[np.where(y_pred==1)[0],]
@@ -123,4 +160,8 @@ def run_live_model(spac_list_current):
     df_pred_pos['%vote_against'] = df_pred_pos['%vote_against'].apply(lambda x: None if np.isnan(x) else '{:.2%}'.format(x))
     df_pred_pos[r'%redeemed'] = df_pred_pos[r'%redeemed'].apply(lambda x: None if np.isnan(x) else '{:.2%}'.format(x))
 
+    # save high-water marks only once 8-Ks are classified, so a failed run scrapes them again
+    if sync_state is not None:
+        sync_state.save()
+
     return df_new_8Ks, df_pred_pos
@@ -4,6 +4,7 @@
 """
 
 
+from classification.preprocess import BASIC_TRANSLATION, normalize_text
 from datetime import datetime as dt
 from datetime import timedelta
 import json
@@ -11,8 +12,6 @@ from lxml import html
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import re
-import requests
 import sec_scraper
 import time
 
@@ -31,7 +30,7 @@ def get_current_spacs(file_path_current, write=False):
     
     # "spac track" spac list
     path_spactrack = 'https://sheet2site.com/api/v3/index.php?key=1F7gLiGZP_F4tZgQXgEhsHMqlgqdSds3vO0-4hoL6ROQ&g=1&e=1&g=1'
-    page = requests.get(path_spactrack)
+    page = sec_scraper.get_session().get(path_spactrack)
     tree = html.fromstring(page.content)
     html_table = tree.xpath('//table[@class="table table-sm"]')
     str_table = html.etree.tostring(html_table[0])
@@ -58,22 +57,15 @@ def get_current_spacs(file_path_current, write=False):
 
 def get_ticker_to_cik(write=False):
     # local copy: data/ticker_to_cik.txt
-    ticker_to_cik = pd.read_csv('https://www.sec.gov/include/ticker.txt',
-                                sep='\t', header=None, names=['ticker','cik'])
+    ticker_to_cik = sec_scraper.get_mapping_store().load('ticker_txt')
     if write:
         ticker_to_cik.to_csv('data/ticker_to_cik.csv', index=False)
-    ticker_to_cik['ticker'] = ticker_to_cik.ticker.str.upper()
-    ticker_to_cik['cik'] = ticker_to_cik.cik.astype(str)
     return ticker_to_cik
 
 
 def get_cik_to_name(write=False):
     # local copy: data/cik_to_name.json
-    cik_to_name = requests.get('https://www.sec.gov/files/company_tickers.json')
-    cik_to_name = json.dumps(cik_to_name.json())
-    cik_to_name = pd.read_json(cik_to_name).transpose()
-    cik_to_name['ticker'] = cik_to_name['ticker'].str.upper()
-    cik_to_name['cik_str'] = cik_to_name['cik_str'].astype(str)
+    cik_to_name = sec_scraper.get_mapping_store().load('company_tickers')
     cik_to_name.rename(columns={'cik_str':'cik'}, inplace=True)
     return cik_to_name
 
@@ -91,31 +83,14 @@ def process_current_spacs(file_path_current=None, spac_list=None, write=False):
     if write==True:
         spac_list_current.to_csv('spac_list_current.csv', index=False)
         
-    # get ticker to cik and cik to company name file, then merge
-    ticker_to_cik = get_ticker_to_cik(write=write)
-    cik_to_name = get_cik_to_name(write=write)
-    spac_list_current = spac_list_current.merge(ticker_to_cik, how='left', left_on='Ticker', right_on='ticker')
-    spac_list_current = spac_list_current.merge(cik_to_name[['cik','ticker','title']], how='left', on=['cik','ticker'])
-    
-    # some current spacs have not split from units to stock + warrants so ticker in sec different
-    ticker_unit = pd.DataFrame(spac_list_current[spac_list_current.ticker.isna()]['Ticker'])
-    ticker_unit['Ticker'] = ticker_unit.Ticker + 'U'
-    ticker_unit = ticker_unit.merge(ticker_to_cik, how='left', left_on='Ticker', right_on='ticker')
-    ticker_unit = ticker_unit.merge(cik_to_name[['cik','ticker','title']], how='left', on=['cik','ticker'])
-    ticker_unit['Ticker'] = ticker_unit.Ticker.apply(lambda x: x[:-1] if not pd.isnull(x) else x)
-    ticker_unit['ticker'] = ticker_unit.ticker.apply(lambda x: x[:-1] if not pd.isnull(x) else x)
-    ticker_unit_other = pd.DataFrame(ticker_unit[ticker_unit.ticker.isna()]['Ticker'])
-    ticker_unit_other['Ticker'] = ticker_unit_other.Ticker.apply(lambda x: x+'-UN')
-    ticker_unit_other = ticker_unit_other.merge(ticker_to_cik, how='left', left_on='Ticker', right_on='ticker')
-    ticker_unit_other = ticker_unit_other.merge(cik_to_name[['cik','ticker','title']], how='left', on=['cik','ticker'])
-    ticker_unit_other['Ticker'] = ticker_unit_other.Ticker.apply(lambda x: x[:-3] if not pd.isnull(x) else x)
-    ticker_unit_other['ticker'] = ticker_unit_other.ticker.apply(lambda x: x[:-3] if not pd.isnull(x) else x)
-    ticker_unit = ticker_unit.append(ticker_unit_other)
-    ticker_unit.dropna(inplace=True)
-    
-    # append tickers found using 'U' and '-UN'
-    spac_list_current = spac_list_current[~spac_list_current.Ticker.isin(ticker_unit.Ticker)]
-    spac_list_current = spac_list_current.append(ticker_unit)
+    # get ticker to cik and cik to company name file, then resolve each ticker
+    # through its first matching symbol form; some current spacs have not
+    # split from units to stock + warrants so ticker in sec different
+    ticker_index = sec_scraper.build_ticker_index(get_ticker_to_cik(write=write),
+                                                  get_cik_to_name(write=write))
+    resolved = sec_scraper.resolve_tickers(spac_list_current.Ticker, ticker_index)
+    spac_list_current = pd.concat([spac_list_current.reset_index(drop=True),
+                                   resolved.drop(columns=['Ticker'])], axis=1)
     
     print('count current spacs:', len(spac_list_current))
     print('count nan in current spacs:', len(spac_list_current[spac_list_current.ticker.isna()]))
@@ -152,23 +127,26 @@ def process_past_spacs(file_path_past, write=False):
 
 def basic_text_cleaning(text):
     """Basic text cleaning."""
-    text = text.replace('\n',' ').replace('\xa0',' ') # replace some unicode characters
-    text = re.sub(' +', ' ', text) # remove extra spaces
-    text = text.lower()
-    return text
+    # replace new lines and some unicode characters, remove extra spaces, lower case
+    return normalize_text(text, BASIC_TRANSLATION)
 
 
 def get_forms_text(company_name, cik_id, form_type):
     """Returns dataframe of all 8-Ks for a given symbol. Columns: date, accepted_time, form, text."""
     try:
-        c = sec_scraper.Company(company_name, cik_id, timeout=20)
+        c = sec_scraper.Company(company_name, cik_id, timeout=20, cache=sec_scraper.get_document_cache())
         filings = c.get_all_filings(filing_type=form_type, no_of_documents=2)
     except:
         print('timed out')
         return None
+    print(company_name, cik_id)
+    return filings_to_df(filings)
+
+
+def filings_to_df(filings):
+    """Returns dataframe of filings. Columns: date, accepted_time, form, text."""
     dates = [f.accepted_date.strftime('%Y-%m-%d %H:%M:%S') for f in filings]
     documents = [basic_text_cleaning(f.documents[0]) for f in filings]
-    print(company_name, cik_id)
     df = pd.DataFrame(list(zip(dates, documents)), columns=['date','text'])
     df['form'] = '8-K'
     df['accepted_time'] = df.date
@@ -358,7 +336,7 @@ def load_all_spacs(use_saved_df=True, write=False, warrants_only=False, conserva
 
 
 def get_spac_track_table(path_spactrack):
-    page = requests.get(path_spactrack)
+    page = sec_scraper.get_session().get(path_spactrack)
     tree = html.fromstring(page.content)
     html_table = tree.xpath('//table[@class="table table-sm"]')
     str_table = html.etree.tostring(html_table[0])